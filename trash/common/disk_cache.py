@@ -0,0 +1,73 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Any, Iterable
+
+
+def code_version(paths: Iterable[str]) -> str:
+    """Хэш исходников, от которых зависит сохранённый результат"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Кэш результатов в pickle-файлах, по одному файлу на ключ.
+    В ключ входят формат (version) и код (code), поэтому после изменения
+    исходников старые записи просто не находятся. Любая ошибка чтения или
+    записи считается промахом: кэш не должен ломать основную программу.
+    Выключенный кэш (enabled=False) ничего не читает и не пишет на диск.
+    """
+
+    def __init__(self, directory: str, version: int, code: str = "", enabled: bool = True):
+        self.directory = directory
+        self.version = version
+        self.code = code
+        self.enabled = enabled
+
+    def fingerprint(self, *parts: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"v{self.version}\n{self.code}\n".encode("utf-8"))
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, f"{fingerprint}.pickle")
+
+    def load(self, fingerprint: str) -> Any | None:
+        if not self.enabled:
+            return None
+        try:
+            with open(self.path(fingerprint), "rb") as file:
+                version, value = pickle.load(file)
+        except Exception:
+            # Нет файла, файл обрезан или ссылается на переехавший класс (ImportError, AttributeError, ...)
+            return None
+        return value if version == self.version else None
+
+    def store(self, fingerprint: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        temp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump((self.version, value), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.path(fingerprint))
+            temp_path = None
+        except Exception:
+            # OSError, PicklingError и т.п.: результат просто не кэшируется
+            pass
+        finally:
+            if temp_path is not None:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
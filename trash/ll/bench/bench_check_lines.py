@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from build_parsing_table import build_parsing_table
+from check_line import check_lines
+from grammar import calculate_directing_sets, factorize_grammar, remove_direct_recursion
+from grammar_utils import parse_grammar
+from table import compile_table
+
+GRAMMAR = [
+    "<S> -> <E> #",
+    "<E> -> <E> + <T>",
+    "<E> -> <T>",
+    "<T> -> <T> * <F>",
+    "<T> -> <F>",
+    "<F> -> ( <E> )",
+    "<F> -> id",
+    "<F> -> - <F>",
+]
+
+
+def generate_expression(rnd: random.Random, depth: int) -> list[str]:
+    if depth == 0:
+        return ["id"]
+    kind = rnd.randrange(4)
+    if kind == 0:
+        return generate_expression(rnd, depth - 1) + ["+"] + generate_expression(rnd, depth - 1)
+    if kind == 1:
+        return generate_expression(rnd, depth - 1) + ["*"] + generate_expression(rnd, depth - 1)
+    if kind == 2:
+        return ["("] + generate_expression(rnd, depth - 1) + [")"]
+    return ["-"] + generate_expression(rnd, depth - 1)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    grammar, axiom = parse_grammar(GRAMMAR)
+    grammar = calculate_directing_sets(factorize_grammar(remove_direct_recursion(grammar)), axiom)
+    table = compile_table(build_parsing_table(grammar, axiom))
+
+    rnd = random.Random(0)
+    lines = [generate_expression(rnd, rnd.randint(1, 5)) + ["#"] for _ in range(count)]
+
+    baseline = None
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        started = time.perf_counter()
+        ok = sum(result.ok for result in check_lines(lines, table, workers=workers, chunk_size=4096))
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"workers={workers:<3} lines={count} ok={ok} time={elapsed:.3f}s "
+              f"lines/s={count / elapsed:,.0f} speedup={baseline / elapsed:.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from grammar import calculate_directing_sets
+from grammar_utils import parse_grammar
+
+
+def generate_grammar(nonterminals: int, terminals: int, seed: int = 0) -> list[str]:
+    rnd = random.Random(seed)
+    names = [f"<N{i}>" for i in range(nonterminals)]
+    alphabet = [f"t{i}" for i in range(terminals)]
+    lines = ["<S> -> <N0> #"]
+    for name in names:
+        for _ in range(rnd.randint(1, 4)):
+            if rnd.random() < 0.15:
+                lines.append(f"{name} -> ε")
+                continue
+            body = [rnd.choice(names) if rnd.random() < 0.5 else rnd.choice(alphabet) for _ in range(rnd.randint(1, 4))]
+            lines.append(f"{name} -> {' '.join(body)}")
+    return lines
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [500, 1000, 2000, 4000, 8000]
+    previous = None
+    for size in sizes:
+        grammar, axiom = parse_grammar(generate_grammar(size, 64))
+        started = time.perf_counter()
+        calculate_directing_sets(grammar, axiom)
+        elapsed = time.perf_counter() - started
+        growth = f" x{elapsed / previous:.2f}" if previous else ""
+        print(f"nonterminals={size:<6} productions={sum(len(r.productions) for r in grammar.rules.values()):<7} "
+              f"time={elapsed:.3f}s{growth}")
+        previous = elapsed
+
+
+if __name__ == "__main__":
+    main()
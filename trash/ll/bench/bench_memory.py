@@ -0,0 +1,61 @@
+import gc
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_directing_sets import generate_grammar
+from build_parsing_table import build_parsing_table
+from grammar import calculate_directing_sets
+from grammar_utils import parse_grammar
+from table import Line, compile_table
+
+
+@dataclass
+class DictLine:
+    number: int
+    symbol: str
+    first_set: list[str]
+    shift: bool
+    error: bool
+    pointer: int | None
+    stack: bool
+    end: bool
+
+
+def measure(build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, result
+
+
+def main() -> None:
+    nonterminals = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    grammar, axiom = parse_grammar(generate_grammar(nonterminals, 64))
+    table = build_parsing_table(calculate_directing_sets(grammar, axiom), axiom)
+    # Both layouts are built from the same decoded rows, so each one allocates its own directing sets
+    rows = [(line.number, line.symbol, line.first_set, line.shift, line.error, line.pointer, line.stack,
+             line.end) for line in table]
+
+    layouts = {
+        "dataclass + list[str]": lambda: [DictLine(n, s, list(f), *rest) for n, s, f, *rest in rows],
+        "slotted Line + id array": lambda: [Line(n, s, f, *rest) for n, s, f, *rest in rows],
+    }
+    sizes = {}
+    for name, build in layouts.items():
+        sizes[name], _ = measure(build)
+    sizes["CompiledTable (struct of arrays)"], _ = measure(lambda: compile_table(table))
+
+    baseline = sizes["dataclass + list[str]"]
+    print(f"rows={len(rows)}")
+    for name, size in sizes.items():
+        print(f"{name:<34} {size / 1024 / 1024:8.2f} MiB  {size / len(rows):8.1f} B/row  x{size / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
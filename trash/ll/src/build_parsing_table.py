@@ -1,6 +1,8 @@
+from array import array
 from itertools import chain
 
 from grammar_utils import Grammar, Production
+from symbol_table import SYMBOLS, TERMINAL
 from table import Line
 from util import is_nonterminal
 
@@ -25,9 +27,9 @@ def build_parsing_table(grammar: Grammar, first_symbol: str) -> list[Line]:
         for prod_idx, production in enumerate(rule.productions):
             error = (prod_idx == len(rule.productions) - 1)
             pointer = index + len(rule.productions) - prod_idx + sum(
-                len(p.symbols) for p in rule.productions[:prod_idx])
+                len(p.ids) for p in rule.productions[:prod_idx])
 
-            table.append(Line(index, rule.nonterminal, production.first_set, shift=False, error=error, pointer=pointer,
+            table.append(Line(index, rule.nonterminal, production.first_set_ids, shift=False, error=error, pointer=pointer,
                               stack=False, end=False))
             index += 1
 
@@ -51,14 +53,14 @@ def compute_rule_indices(grammar: Grammar) -> dict[str, int]:
     index = 0
     for rule in grammar.rules.values():
         rule_indices[rule.nonterminal] = index
-        index += sum(len(production.symbols) + 1 for production in rule.productions)
+        index += sum(len(production.ids) + 1 for production in rule.productions)
     return rule_indices
 
 
-def get_first_set(symbol: str, grammar: Grammar, production: Production) -> list[str]:
+def get_first_set(symbol: str, grammar: Grammar, production: Production) -> array:
     if is_nonterminal(symbol):
-        return list(set(chain.from_iterable(prod.first_set for prod in grammar.rules[symbol].productions)))
-    return production.first_set if symbol == "ε" else [symbol]
+        return array("i", set(chain.from_iterable(prod.first_set_ids for prod in grammar.rules[symbol].productions)))
+    return production.first_set_ids if symbol == "ε" else array("i", [SYMBOLS.intern(symbol)])
 
 
 def get_pointer(symbol: str, symbols: list[str], index: int, current_index: int,
@@ -75,4 +77,4 @@ def check_end(symbol: str, symbols: list[str], index: int, end_set: bool) -> (bo
 
 
 def is_terminal(symbol: str) -> bool:
-    return not is_nonterminal(symbol) and symbol != "ε"
+    return SYMBOLS.kind(symbol) == TERMINAL
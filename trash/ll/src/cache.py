@@ -0,0 +1,47 @@
+import importlib.util
+import os
+
+from grammar_utils import Grammar
+from table import Line
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load_disk_cache():
+    # The shared helper is loaded by file path so that importing this module leaves sys.path alone
+    spec = importlib.util.spec_from_file_location(
+        "disk_cache", os.path.join(SOURCE_DIR, "..", "..", "common", "disk_cache.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_disk_cache = _load_disk_cache()
+DiskCache = _disk_cache.DiskCache
+code_version = _disk_cache.code_version
+
+CACHE_VERSION = 4
+CACHE_DIR = os.environ.get("LL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ll-tables"))
+# LL_NO_CACHE=1 turns the on-disk cache off
+CACHE_ENABLED = os.environ.get("LL_NO_CACHE", "") in ("", "0")
+# The cached grammar and table depend on the analysis code as well as on the input grammar
+CODE_VERSION = code_version(os.path.join(SOURCE_DIR, name) for name in (
+    "grammar.py", "grammar_utils.py", "symbol_table.py", "table.py", "build_parsing_table.py"))
+
+
+def _cache(cache_dir: str) -> DiskCache:
+    return DiskCache(cache_dir, CACHE_VERSION, CODE_VERSION, CACHE_ENABLED)
+
+
+def grammar_fingerprint(grammar: Grammar, start_symbol: str) -> str:
+    lines = [f"{nonterminal} -> {' '.join(production.symbols)}"
+             for nonterminal, rule in grammar.rules.items() for production in rule.productions]
+    return _cache(CACHE_DIR).fingerprint(start_symbol, *lines)
+
+
+def load_cached(fingerprint: str, cache_dir: str = CACHE_DIR) -> tuple[Grammar, list[Line]] | None:
+    return _cache(cache_dir).load(fingerprint)
+
+
+def store_cached(fingerprint: str, grammar: Grammar, table: list[Line], cache_dir: str = CACHE_DIR) -> None:
+    _cache(cache_dir).store(fingerprint, (grammar, table))
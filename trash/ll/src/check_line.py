@@ -1,31 +1,164 @@
-from table import Line
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from enum import Enum
+from itertools import islice
+from typing import Iterable, Iterator
 
+from symbol_table import SYMBOLS
+from table import Line, CompiledTable, compile_table
 
-def check_line(line: list[str], table: list[Line]) -> str:
+
+class CheckStatus(Enum):
+    OK = "ok"
+    INVALID_POSITION = "invalid_position"
+    UNEXPECTED_SYMBOL = "unexpected_symbol"
+    UNEXPECTED_EOL = "unexpected_eol"
+    NO_POINTER = "no_pointer"
+    INCOMPLETE = "incomplete"
+
+
+class CheckResult:
+    __slots__ = ("status", "index", "position", "table", "symbol")
+
+    def __init__(self, status: CheckStatus, index: int, position: int, table: CompiledTable | dict[int, Line],
+                 symbol: str | None = None):
+        self.status = status
+        self.index = index
+        self.position = position
+        self.table = table
+        self.symbol = symbol
+
+    @property
+    def ok(self) -> bool:
+        return self.status is CheckStatus.OK
+
+    @property
+    def expected(self) -> list[str]:
+        if self.status is not CheckStatus.UNEXPECTED_SYMBOL:
+            return []
+        if isinstance(self.table, CompiledTable):
+            return self.table.first_sets[self.position]
+        return self.table[self.position].first_set
+
+    @property
+    def message(self) -> str:
+        status = self.status
+        if status is CheckStatus.OK:
+            return "Ok"
+        if status is CheckStatus.INVALID_POSITION:
+            return f"Error: Invalid position {self.position}"
+        if status is CheckStatus.UNEXPECTED_SYMBOL:
+            return f"Error at index {self.index}: '{self.symbol}' not in {self.expected}"
+        if status is CheckStatus.UNEXPECTED_EOL:
+            return "Error: Unexpected EOL"
+        if status is CheckStatus.NO_POINTER:
+            return f"Error at index {self.index}: No valid pointer"
+        return "Error: Incomplete processing (No EOL)"
+
+    def __bool__(self) -> bool:
+        return self.status is CheckStatus.OK
+
+    def __str__(self) -> str:
+        return self.message
+
+    def __repr__(self) -> str:
+        return f"CheckResult({self.status.name}, index={self.index}, position={self.position})"
+
+
+_END = object()
+
+
+def check_line(line: list[str], table: list[Line] | CompiledTable) -> CheckResult:
+    return check_tokens(line, table)
+
+
+def check_tokens(tokens: Iterable[str], table: list[Line] | CompiledTable) -> CheckResult:
+    if not isinstance(table, CompiledTable):
+        # Compiling costs more than one line is worth; batches go through check_lines, which compiles once
+        return _check_rows(tokens, table)
+
+    terminal_bits = table.terminal_bits
+    masks = table.first_set_masks
+    pointers = table.pointer
+    shifts = table.shift
+    errors = table.error
+    stacks = table.stack
+    ends = table.end
+    defined = table.defined
+    size = len(table)
+
+    iterator = iter(tokens)
+    symbol = next(iterator, _END)
+    lookahead = next(iterator, _END)
     index = 0
     current_position = 0
     stack = []
-    table_dict = {l.number: l for l in table}
 
-    while index < len(line):
-        if current_position not in table_dict:
-            return f"Error: Invalid position {current_position}"
+    while symbol is not _END:
+        if current_position >= size or not defined[current_position]:
+            return CheckResult(CheckStatus.INVALID_POSITION, index, current_position, table)
 
-        current = table_dict[current_position]
-        symbol = line[index]
+        if not masks[current_position] & terminal_bits.get(symbol, 0):
+            if errors[current_position]:
+                return CheckResult(CheckStatus.UNEXPECTED_SYMBOL, index, current_position, table, symbol)
+            else:
+                current_position += 1
+                continue
+
+        if ends[current_position]:
+            if lookahead is _END:
+                return CheckResult(CheckStatus.OK, index, current_position, table)
+            return CheckResult(CheckStatus.UNEXPECTED_EOL, index, current_position, table)
 
-        if symbol not in current.first_set:
+        if shifts[current_position]:
+            index += 1
+            symbol = lookahead
+            lookahead = next(iterator, _END) if lookahead is not _END else _END
+        if stacks[current_position]:
+            stack.append(current_position + 1)
+        if pointers[current_position] > 0:
+            current_position = pointers[current_position]
+        elif stack:
+            current_position = stack.pop()
+        else:
+            return CheckResult(CheckStatus.NO_POINTER, index, current_position, table)
+
+    return CheckResult(CheckStatus.INCOMPLETE, index, current_position, table)
+
+
+def _check_rows(tokens: Iterable[str], table: list[Line]) -> CheckResult:
+    rows = {line.number: line for line in table}
+    symbol_ids = SYMBOLS.ids
+
+    iterator = iter(tokens)
+    symbol = next(iterator, _END)
+    lookahead = next(iterator, _END)
+    index = 0
+    current_position = 0
+    stack = []
+
+    while symbol is not _END:
+        current = rows.get(current_position)
+        if current is None:
+            return CheckResult(CheckStatus.INVALID_POSITION, index, current_position, rows)
+
+        if symbol_ids.get(symbol, -1) not in current.first_set_ids:
             if current.error:
-                return f"Error at index {index}: '{symbol}' not in {current.first_set}"
+                return CheckResult(CheckStatus.UNEXPECTED_SYMBOL, index, current_position, rows, symbol)
             else:
                 current_position += 1
                 continue
 
         if current.end:
-            return "Ok" if index == len(line) - 1 else "Error: Unexpected EOL"
+            if lookahead is _END:
+                return CheckResult(CheckStatus.OK, index, current_position, rows)
+            return CheckResult(CheckStatus.UNEXPECTED_EOL, index, current_position, rows)
 
         if current.shift:
             index += 1
+            symbol = lookahead
+            lookahead = next(iterator, _END) if lookahead is not _END else _END
         if current.stack:
             stack.append(current_position + 1)
         if current.pointer:
@@ -33,6 +166,72 @@ def check_line(line: list[str], table: list[Line]) -> str:
         elif stack:
             current_position = stack.pop()
         else:
-            return f"Error at index {index}: No valid pointer"
+            return CheckResult(CheckStatus.NO_POINTER, index, current_position, rows)
+
+    return CheckResult(CheckStatus.INCOMPLETE, index, current_position, rows)
+
+
+_worker_table: CompiledTable | None = None
+
+
+def _init_worker(table: CompiledTable) -> None:
+    global _worker_table
+    _worker_table = table
+
+
+def _check_chunk(start: int, lines: list[list[str]]) -> tuple[int, list[tuple]]:
+    # results travel back without the table reference, the parent re-attaches its own copy
+    results = []
+    for line in lines:
+        result = check_line(line, _worker_table)
+        results.append((result.status, result.index, result.position, result.symbol))
+    return start, results
+
+
+def _chunks(lines: Iterable[list[str]], chunk_size: int) -> Iterator[tuple[int, list[list[str]]]]:
+    iterator = iter(lines)
+    start = 0
+    while chunk := list(islice(iterator, chunk_size)):
+        yield start, chunk
+        start += len(chunk)
+
+
+def check_lines(lines: Iterable[list[str]], table: list[Line] | CompiledTable, workers: int | None = None,
+                chunk_size: int = 1024, ordered: bool = True) -> Iterator[CheckResult] | Iterator[tuple[int, CheckResult]]:
+    # ordered=True yields results in input order, otherwise (index, result) pairs as chunks complete
+    if not isinstance(table, CompiledTable):
+        table = compile_table(table)
+
+    if workers == 1:
+        for index, line in enumerate(lines):
+            result = check_line(line, table)
+            yield result if ordered else (index, result)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(table,)) as pool:
+        max_pending = workers * 4
+        chunks = _chunks(lines, chunk_size)
+        pending = deque()
+
+        for start, chunk in islice(chunks, max_pending):
+            pending.append(pool.submit(_check_chunk, start, chunk))
+
+        if ordered:
+            while pending:
+                _, results = pending.popleft().result()
+                for start, chunk in islice(chunks, 1):
+                    pending.append(pool.submit(_check_chunk, start, chunk))
+                for status, index, position, symbol in results:
+                    yield CheckResult(status, index, position, table, symbol)
+            return
 
-    return "Error: Incomplete processing (No EOL)"
+        pending = set(pending)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, results = future.result()
+                for next_start, chunk in islice(chunks, 1):
+                    pending.add(pool.submit(_check_chunk, next_start, chunk))
+                for index, (status, line_index, position, symbol) in enumerate(results, start):
+                    yield index, CheckResult(status, line_index, position, table, symbol)
@@ -1,176 +1,276 @@
+from array import array
+from collections import deque
+
 from grammar_utils import Grammar, Rule, Production
-from util import is_nonterminal
+from symbol_table import EPSILON, EPSILON_ID, NONTERMINAL, SYMBOLS
+
+
+class _TrieNode:
+    __slots__ = ("children", "order", "end")
+
+    def __init__(self, order: int):
+        self.children: dict[str, _TrieNode] = {}
+        self.order = order
+        self.end: int | None = None
 
 
 def factorize_grammar(grammar: Grammar) -> Grammar:
     new_grammar = Grammar({})
+    used_names = grammar_names(grammar)
+    next_index: dict[str, int] = {}
 
     for nonterminal, rule in grammar.rules.items():
-        productions_by_prefix = find_common_prefixes(rule.productions)
-
-        if len(productions_by_prefix) == len(rule.productions):
+        root = build_production_trie(rule.productions)
+        if not has_common_prefix(root):
             new_grammar.rules[nonterminal] = rule
             continue
 
-        new_rule = Rule(nonterminal, [])
-
-        for prefix, productions in productions_by_prefix.items():
-            if len(productions) == 1:
-                new_rule.productions.append(productions[0])
-                continue
-
-            new_nonterminal = f"<{nonterminal.strip('<>')}'>"
-
-            prefix_symbols = list(prefix)
-            new_rule.productions.append(Production(prefix_symbols + [new_nonterminal], []))
-
-            suffix_productions = []
-            for production in productions:
-                suffix = production.symbols[len(prefix_symbols):]
-                suffix_productions.append(Production(suffix or ["ε"], []))
-
-            new_grammar.rules[new_nonterminal] = Rule(new_nonterminal, suffix_productions)
-
-        new_grammar.rules[nonterminal] = new_rule
+        new_rules = {nonterminal: Rule(nonterminal, [])}
+        factored: dict[str, list[str]] = {nonterminal: []}
+        pending = deque([(nonterminal, root)])
+        while pending:
+            owner, node = pending.popleft()
+            productions = new_rules[owner].productions
+            for _, prefix, target in factor_alternatives(node):
+                if target is None:
+                    productions.append(Production(prefix or ["ε"], []))
+                    continue
+                new_nonterminal = fresh_nonterminal(nonterminal, used_names, next_index)
+                new_rules[new_nonterminal] = Rule(new_nonterminal, [])
+                factored[owner].append(new_nonterminal)
+                factored[new_nonterminal] = []
+                productions.append(Production(prefix + [new_nonterminal], []))
+                pending.append((new_nonterminal, target))
 
-    if any(len(find_common_prefixes(rule.productions)) < len(rule.productions) for rule in new_grammar.rules.values()):
-        return factorize_grammar(new_grammar)
+        for name in factored_rule_order(nonterminal, factored):
+            new_grammar.rules[name] = new_rules[name]
 
     return new_grammar
 
 
-def find_common_prefixes(productions: list[Production]) -> dict[tuple, list[Production]]:
-    if not productions:
-        return {}
-
-    result = {}
-    processed = set()
-
-    for i, prod1 in enumerate(productions):
-        if i in processed:
-            continue
-
-        common_prefix = []
-        common_productions = [prod1]
-        processed.add(i)
-
-        for j, prod2 in enumerate(productions[i + 1:], i + 1):
-            if j in processed:
+def factored_rule_order(nonterminal: str, factored: dict[str, list[str]]) -> list[str]:
+    # Factored-out rules go before the rule they were taken from, nested ones first
+    order = []
+    for child in factored[nonterminal]:
+        order.extend(factored_rule_order(child, factored))
+    order.append(nonterminal)
+    return order
+
+
+def build_production_trie(productions: list[Production]) -> _TrieNode:
+    root = _TrieNode(0)
+    for order, production in enumerate(productions):
+        node = root
+        for symbol in production.symbols:
+            if symbol == "ε":
                 continue
+            child = node.children.get(symbol)
+            if child is None:
+                child = node.children[symbol] = _TrieNode(order)
+            node = child
+        if node.end is None:
+            node.end = order
+    return root
+
+
+def has_common_prefix(root: _TrieNode) -> bool:
+    for child in root.children.values():
+        node = child
+        while True:
+            if len(node.children) > 1 or (node.children and node.end is not None):
+                return True
+            if not node.children:
+                break
+            node = next(iter(node.children.values()))
+    return False
+
+
+def factor_alternatives(node: _TrieNode) -> list[tuple[int, list[str], _TrieNode | None]]:
+    alternatives = []
+    if node.end is not None:
+        alternatives.append((node.end, [], None))
+
+    for symbol, child in node.children.items():
+        prefix = [symbol]
+        while len(child.children) == 1 and child.end is None:
+            symbol, child = next(iter(child.children.items()))
+            prefix.append(symbol)
+        alternatives.append((child.order, prefix, child if child.children else None))
+
+    alternatives.sort(key=lambda alternative: alternative[0])
+    return alternatives
+
+
+def grammar_names(grammar: Grammar) -> set[str]:
+    names = set(grammar.rules)
+    for rule in grammar.rules.values():
+        for production in rule.productions:
+            names.update(production.symbols)
+    return names
 
-            common_length = 0
-            min_length = min(len(prod1.symbols), len(prod2.symbols))
-
-            for k in range(min_length):
-                if prod1.symbols[k] == prod2.symbols[k]:
-                    common_length = k + 1
-                else:
-                    break
-
-            if common_length > 0:
-                if not common_prefix or common_length >= len(common_prefix):
-                    if common_length > len(common_prefix):
-                        common_prefix = prod1.symbols[:common_length]
-                        common_productions = [prod1, prod2]
-                    else:
-                        common_productions.append(prod2)
-                    processed.add(j)
-
-        if len(common_productions) > 1:
-            prefix_key = tuple(common_prefix)
-            result[prefix_key] = common_productions
-        else:
-            first_symbol = prod1.symbols[0] if prod1.symbols else "ε"
-            prefix_key = (f"{first_symbol}_unique_{i}",)
-            result[prefix_key] = [prod1]
 
-    return result
+def fresh_nonterminal(nonterminal: str, used_names: set[str], next_index: dict[str, int], suffix: str = "'") -> str:
+    base = nonterminal.strip('<>')
+    index = next_index.get(base, 0)
+    name = f"<{base}{suffix}>" if index == 0 else f"<{base}{suffix}{index}>"
+    while name in used_names:
+        index += 1
+        name = f"<{base}{suffix}{index}>"
+    next_index[base] = index + 1
+    used_names.add(name)
+    return name
 
 
 def remove_direct_recursion(grammar: Grammar) -> Grammar:
     new_grammar = Grammar({})
+    used_names = grammar_names(grammar)
+    next_index: dict[str, int] = {}
 
     for nonterminal, rule in grammar.rules.items():
-        recursive = []
-        non_recursive = []
+        for new_rule in split_direct_recursion(rule, used_names, next_index):
+            new_grammar.rules[new_rule.nonterminal] = new_rule
 
-        for production in rule.productions:
-            if production.symbols and production.symbols[0] == nonterminal:
-                recursive.append(production.symbols[1:])
-            else:
-                non_recursive.append(production.symbols)
+    return new_grammar
 
-        if recursive:
-            new_nonterminal = f"<{nonterminal.strip('<>')}r>"
-            new_grammar.rules[new_nonterminal] = Rule(new_nonterminal, [])
 
-            new_grammar.rules[nonterminal] = Rule(nonterminal, [])
-            for body in non_recursive:
-                clean_body = [] if body == ["ε"] else body
-                new_body = clean_body + [new_nonterminal]
-                new_grammar.rules[nonterminal].productions.append(Production(new_body, []))
+def split_direct_recursion(rule: Rule, used_names: set[str], next_index: dict[str, int]) -> list[Rule]:
+    nonterminal = rule.nonterminal
+    nonterminal_id = SYMBOLS.intern(nonterminal)
+    recursive = []
+    non_recursive = []
 
-            new_grammar.rules[new_nonterminal].productions = [Production(body + [new_nonterminal], []) for body in
-                                                              recursive] + [Production(["ε"], [])]
+    for production in rule.productions:
+        ids = production.ids
+        if ids and ids[0] == nonterminal_id:
+            recursive.append(ids[1:])
         else:
-            new_grammar.rules[nonterminal] = rule
+            non_recursive.append(ids)
 
-    return new_grammar
+    if not recursive:
+        return [rule]
+
+    # The helper is <Xr> unless a symbol of the grammar (e.g. an earlier pass's helper) already has that name
+    new_nonterminal = fresh_nonterminal(nonterminal, used_names, next_index, "r")
+    tail = array("i", [SYMBOLS.intern(new_nonterminal)])
+    new_rule = Rule(new_nonterminal, [Production(body + tail, []) for body in recursive] +
+                    [Production(array("i", [EPSILON_ID]), [])])
+
+    base_rule = Rule(nonterminal, [])
+    for body in non_recursive:
+        clean_body = array("i") if is_epsilon(body) else body
+        base_rule.productions.append(Production(clean_body + tail, []))
+
+    return [new_rule, base_rule]
 
 
 def build_dependency_graph(grammar: Grammar) -> dict[str, set[str]]:
     graph = dict()
+    names = SYMBOLS.names
     for nonterminal, rule in grammar.rules.items():
         for production in rule.productions:
             graph.setdefault(nonterminal, set())
-            if production.symbols and production.symbols[0] in grammar.rules:
-                graph[nonterminal].add(production.symbols[0])
+            if production.ids and names[production.ids[0]] in grammar.rules:
+                graph[nonterminal].add(names[production.ids[0]])
     return graph
 
 
-def topological_sort(graph: dict[str, set[str]], nonterminal: str) -> tuple[list[str], bool]:
-    visited = []
-    order = []
+def is_epsilon(ids: array) -> bool:
+    return len(ids) == 1 and ids[0] == EPSILON_ID
+
+
+def strongly_connected_components(graph: dict[str, set[str]]) -> list[list[str]]:
+    index_of: dict[str, int] = {}
+    lowlink: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    components: list[list[str]] = []
 
-    def dfs(node: str) -> None:
-        if node in visited:
-            visited.append(node)
-            return
-        visited.append(node)
-        for neighbor in graph[node]:
-            if neighbor != node:
-                dfs(neighbor)
-        order.append(node)
+    for root in graph:
+        if root in index_of:
+            continue
+
+        index_of[root] = lowlink[root] = len(index_of)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
 
-    dfs(nonterminal)
+        while work:
+            node, neighbors = work[-1]
+            for neighbor in neighbors:
+                if neighbor not in graph:
+                    continue
+                if neighbor not in index_of:
+                    index_of[neighbor] = lowlink[neighbor] = len(index_of)
+                    stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    work.append((neighbor, iter(graph[neighbor])))
+                    break
+                if neighbor in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[neighbor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
 
-    return order, len(visited) != len(order)
+    return components
 
 
 def remove_indirect_recursion(grammar: Grammar) -> Grammar:
     graph = build_dependency_graph(grammar)
-
-    for node in graph:
-        order, is_indirect = topological_sort(graph, node)
-        order = order[:-1]
-        if not is_indirect:
+    position = {nonterminal: i for i, nonterminal in enumerate(grammar.rules)}
+    rules = dict(grammar.rules)
+    replaced: dict[str, list[Rule]] = {}
+    used_names = grammar_names(grammar)
+    next_index: dict[str, int] = {}
+
+    for component in strongly_connected_components(graph):
+        if len(component) < 2:
             continue
 
+        order = sorted(component, key=position.__getitem__)
+        rank = {SYMBOLS.intern(nonterminal): i for i, nonterminal in enumerate(order)}
         for i, a_i in enumerate(order):
-            for j in range(i):
+            productions = rules[a_i].productions
+            leading = {rank[p.ids[0]] for p in productions if p.ids and rank.get(p.ids[0], i) < i}
+            while leading:
+                j = min(leading)
+                leading.discard(j)
                 a_j = order[j]
+                a_j_id = SYMBOLS.intern(a_j)
                 new_productions = []
-
-                for production in grammar.rules[a_i].productions:
-                    if production.symbols and production.symbols[0] == a_j:
-                        for a_j_prod in grammar.rules[a_j].productions:
-                            new_productions.append(Production(a_j_prod.symbols + production.symbols[1:], []))
+                for production in productions:
+                    if production.ids and production.ids[0] == a_j_id:
+                        for a_j_prod in rules[a_j].productions:
+                            head = array("i") if is_epsilon(a_j_prod.ids) else a_j_prod.ids
+                            symbol_ids = head + production.ids[1:] or array("i", [EPSILON_ID])
+                            new_productions.append(Production(symbol_ids, []))
+                            if j < rank.get(symbol_ids[0], j) < i:
+                                leading.add(rank[symbol_ids[0]])
                     else:
                         new_productions.append(production)
+                productions = new_productions
 
-                grammar.rules[a_i].productions = new_productions
+            # a_i may now be directly left-recursive; later members substitute its productions, so split it here
+            split = split_direct_recursion(Rule(a_i, productions), used_names, next_index)
+            for new_rule in split:
+                rules[new_rule.nonterminal] = new_rule
+            replaced[a_i] = split
 
-    return grammar
+    new_grammar = Grammar({})
+    for nonterminal in grammar.rules:
+        for rule in replaced.get(nonterminal, [rules[nonterminal]]):
+            new_grammar.rules[rule.nonterminal] = rule
+    return new_grammar
 
 
 def remove_unreachable_rules(grammar: Grammar, start_symbol: str) -> Grammar:
@@ -192,147 +292,267 @@ def remove_unreachable_rules(grammar: Grammar, start_symbol: str) -> Grammar:
     return Grammar(new_rules)
 
 
-def calculate_directing_sets(grammar: Grammar, start_symbol: str) -> Grammar:
-    first_sets = {}
-
-    for rule in grammar.rules.values():
-        for production in rule.productions:
-            for symbol in production.symbols:
-                if not (is_nonterminal(symbol)):
-                    first_sets[symbol] = {symbol}
-
-    for nonterminal in grammar.rules:
-        first_sets[nonterminal] = set()
-
-    changed = True
-    while changed:
-        changed = False
-        for nonterminal, rule in grammar.rules.items():
-            for production in rule.productions:
-                all_can_derive_empty = True
-                for symbol in production.symbols:
-                    if symbol == "ε":
-                        continue
-
-                    if not (is_nonterminal(symbol)):
-                        if symbol not in first_sets[nonterminal]:
-                            first_sets[nonterminal].add(symbol)
-                            changed = True
-                        all_can_derive_empty = False
-                        break
-
-                    for sym in first_sets.get(symbol, set()):
-                        if sym != "ε" and sym not in first_sets[nonterminal]:
-                            first_sets[nonterminal].add(sym)
-                            changed = True
-
-                    if "ε" not in first_sets.get(symbol, set()):
-                        all_can_derive_empty = False
-                        break
+class _SymbolBits:
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+        self.names: list[str] = []
+
+    def bit(self, symbol: str) -> int:
+        symbol_id = self.ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = len(self.names)
+            self.ids[symbol] = symbol_id
+            self.names.append(symbol)
+        return 1 << symbol_id
+
+    def decode(self, mask: int) -> list[str]:
+        names = self.names
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(names[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+
+def _closure(seeds: set[str], edges: dict[str, set[str]]) -> set[str]:
+    result = set(seeds)
+    stack = list(seeds)
+    while stack:
+        for target in edges.get(stack.pop(), ()):
+            if target not in result:
+                result.add(target)
+                stack.append(target)
+    return result
 
-                if all_can_derive_empty and "ε" not in first_sets[nonterminal]:
-                    first_sets[nonterminal].add("ε")
-                    changed = True
 
-    follow_sets = {nonterminal: set() for nonterminal in grammar.rules}
+def compute_first_sets(grammar: Grammar, bits: _SymbolBits,
+                       previous: tuple[dict[str, int], dict[str, bool]] | None = None,
+                       seeds: set[str] | None = None) -> tuple[dict[str, int], dict[str, bool], set[str]]:
+    # Edges also cover referenced nonterminals without a rule (e.g. removed since the previous run)
+    dependents: dict[str, set[str]] = {nonterminal: set() for nonterminal in grammar.rules}
+    compiled: dict[str, list[list[str | int]]] = {}
+    kinds, names = SYMBOLS.kinds, SYMBOLS.names
 
-    follow_sets[start_symbol].add(grammar.rules[start_symbol].productions[0].symbols[-1])
+    for nonterminal, rule in grammar.rules.items():
+        compiled[nonterminal] = []
+        for production in rule.productions:
+            body = []
+            for symbol_id in production.ids:
+                kind = kinds[symbol_id]
+                if kind == EPSILON:
+                    continue
+                symbol = names[symbol_id]
+                if kind != NONTERMINAL:
+                    body.append(bits.bit(symbol))
+                    break
+                body.append(symbol)
+                dependents.setdefault(symbol, set()).add(nonterminal)
+            compiled[nonterminal].append(body)
+
+    if previous is None or seeds is None:
+        affected = set(grammar.rules)
+        first = {nonterminal: 0 for nonterminal in grammar.rules}
+        nullable = {nonterminal: False for nonterminal in grammar.rules}
+    else:
+        affected = _closure(seeds, dependents) & grammar.rules.keys()
+        first = {nonterminal: 0 if nonterminal in affected else previous[0][nonterminal] for nonterminal in grammar.rules}
+        nullable = {nonterminal: nonterminal not in affected and previous[1][nonterminal]
+                    for nonterminal in grammar.rules}
+
+    worklist = deque(nonterminal for nonterminal in grammar.rules if nonterminal in affected)
+    queued = set(worklist)
+
+    while worklist:
+        nonterminal = worklist.popleft()
+        queued.discard(nonterminal)
+
+        new_first = 0
+        new_nullable = False
+        for body in compiled[nonterminal]:
+            all_can_derive_empty = True
+            for symbol in body:
+                if symbol.__class__ is int:
+                    new_first |= symbol
+                    all_can_derive_empty = False
+                    break
+                new_first |= first.get(symbol, 0)
+                if not nullable.get(symbol, False):
+                    all_can_derive_empty = False
+                    break
+            new_nullable = new_nullable or all_can_derive_empty
 
-    changed = True
-    while changed:
-        changed = False
-        for nonterminal, rule in grammar.rules.items():
-            for production in rule.productions:
-                for i, symbol in enumerate(production.symbols):
-                    if not (is_nonterminal(symbol)) or symbol == "ε":
-                        continue
+        if new_first != first[nonterminal] or new_nullable != nullable[nonterminal]:
+            first[nonterminal] = new_first
+            nullable[nonterminal] = new_nullable
+            for dependent in dependents[nonterminal]:
+                if dependent not in queued:
+                    queued.add(dependent)
+                    worklist.append(dependent)
 
-                    trailing_first = set()
-                    all_can_derive_empty = True
+    return first, nullable, affected
 
-                    for j in range(i + 1, len(production.symbols)):
-                        next_symbol = production.symbols[j]
-                        if next_symbol == "ε":
-                            continue
 
-                        symbol_first = first_sets.get(next_symbol, {next_symbol})
-                        for sym in symbol_first:
-                            if sym != "ε":
-                                trailing_first.add(sym)
+def compute_follow_sets(grammar: Grammar, start_symbol: str, first: dict[str, int], nullable: dict[str, bool],
+                        bits: _SymbolBits, previous: dict[str, int] | None = None,
+                        seeds: set[str] | None = None) -> tuple[dict[str, int], set[str]]:
+    successors: dict[str, set[str]] = {nonterminal: set() for nonterminal in grammar.rules}
+    trailing_sets: list[tuple[str, int]] = []
+    kinds, names = SYMBOLS.kinds, SYMBOLS.names
 
-                        if "ε" not in symbol_first:
-                            all_can_derive_empty = False
-                            break
+    for nonterminal, rule in grammar.rules.items():
+        for production in rule.productions:
+            trailing = 0
+            all_can_derive_empty = True
+            for symbol_id in reversed(production.ids):
+                if kinds[symbol_id] == EPSILON:
+                    continue
+                symbol = names[symbol_id]
+                if symbol in first:
+                    if trailing:
+                        trailing_sets.append((symbol, trailing))
+                    if all_can_derive_empty and symbol != nonterminal:
+                        successors[nonterminal].add(symbol)
+                    if nullable[symbol]:
+                        trailing |= first[symbol]
+                    else:
+                        trailing = first[symbol]
+                        all_can_derive_empty = False
+                else:
+                    trailing = bits.bit(symbol)
+                    all_can_derive_empty = False
+
+    if previous is None or seeds is None:
+        affected = set(grammar.rules)
+        follow = {nonterminal: 0 for nonterminal in grammar.rules}
+    else:
+        affected = _closure(seeds, successors) & grammar.rules.keys()
+        follow = {nonterminal: 0 if nonterminal in affected else previous[nonterminal] for nonterminal in grammar.rules}
+
+    if start_symbol in affected:
+        follow[start_symbol] |= bits.bit(names[grammar.rules[start_symbol].productions[0].ids[-1]])
+    for symbol, trailing in trailing_sets:
+        if symbol in affected:
+            follow[symbol] |= trailing
+
+    worklist = [nonterminal for nonterminal in grammar.rules if follow[nonterminal]]
+    queued = set(worklist)
+
+    while worklist:
+        nonterminal = worklist.pop()
+        queued.discard(nonterminal)
+        mask = follow[nonterminal]
+        for successor in successors[nonterminal]:
+            if successor in affected and mask & ~follow[successor]:
+                follow[successor] |= mask
+                if successor not in queued:
+                    queued.add(successor)
+                    worklist.append(successor)
+
+    return follow, affected
+
+
+class DirectingSetsAnalysis:
+    def __init__(self, grammar: Grammar, start_symbol: str, bits: _SymbolBits, first: dict[str, int],
+                 nullable: dict[str, bool], follow: dict[str, int], recomputed: set[str]):
+        self.grammar = grammar
+        self.start_symbol = start_symbol
+        self.bits = bits
+        self.first = first
+        self.nullable = nullable
+        self.follow = follow
+        self.recomputed = recomputed
+        self.signatures = {nonterminal: rule_signature(rule) for nonterminal, rule in grammar.rules.items()}
+
+
+def rule_signature(rule: Rule) -> tuple[bytes, ...]:
+    return tuple(production.ids.tobytes() for production in rule.productions)
 
-                    if all_can_derive_empty or i == len(production.symbols) - 1:
-                        for follow_sym in follow_sets[nonterminal]:
-                            if follow_sym not in follow_sets[symbol]:
-                                follow_sets[symbol].add(follow_sym)
-                                changed = True
 
-                    for sym in trailing_first:
-                        if sym not in follow_sets[symbol]:
-                            follow_sets[symbol].add(sym)
-                            changed = True
+def calculate_directing_sets(grammar: Grammar, start_symbol: str) -> Grammar:
+    return analyze_directing_sets(grammar, start_symbol).grammar
+
+
+def analyze_directing_sets(grammar: Grammar, start_symbol: str,
+                           previous: DirectingSetsAnalysis | None = None) -> DirectingSetsAnalysis:
+    if previous is not None and previous.start_symbol != start_symbol:
+        previous = None
+
+    if previous is None:
+        bits = _SymbolBits()
+        first, nullable, _ = compute_first_sets(grammar, bits)
+        follow, _ = compute_follow_sets(grammar, start_symbol, first, nullable, bits)
+        recomputed = set(grammar.rules)
+    else:
+        bits = previous.bits
+        old_rules = previous.grammar.rules
+        removed = old_rules.keys() - grammar.rules.keys()
+        changed = {nonterminal for nonterminal, rule in grammar.rules.items()
+                   if previous.signatures.get(nonterminal) != rule_signature(rule)}
+        changed |= removed
+
+        first, nullable, first_affected = compute_first_sets(grammar, bits, (previous.first, previous.nullable),
+                                                             changed)
+        first_changed = {nonterminal for nonterminal in first_affected | removed
+                         if first.get(nonterminal) != previous.first.get(nonterminal)
+                         or nullable.get(nonterminal) != previous.nullable.get(nonterminal)}
+
+        follow_seeds = changed | first_changed
+        for nonterminal in changed:
+            for rule in (old_rules.get(nonterminal), grammar.rules.get(nonterminal)):
+                if rule is not None:
+                    for production in rule.productions:
+                        follow_seeds.update(production.symbols)
+        uses_changed_first = set()
+        if first_changed:
+            first_changed_ids = {SYMBOLS.intern(nonterminal) for nonterminal in first_changed}
+            for nonterminal, rule in grammar.rules.items():
+                for production in rule.productions:
+                    if not first_changed_ids.isdisjoint(production.ids):
+                        follow_seeds.update(production.symbols)
+                        uses_changed_first.add(nonterminal)
+        follow, follow_affected = compute_follow_sets(grammar, start_symbol, first, nullable, bits, previous.follow,
+                                                      follow_seeds)
+
+        recomputed = changed | uses_changed_first
+        recomputed.update(nonterminal for nonterminal in follow_affected
+                          if follow[nonterminal] != previous.follow.get(nonterminal))
 
     new_grammar = Grammar({})
     for nonterminal, rule in grammar.rules.items():
+        if nonterminal not in recomputed:
+            new_grammar.rules[nonterminal] = previous.grammar.rules[nonterminal]
+            continue
+
         new_rule = Rule(nonterminal, [])
         for production in rule.productions:
-            prod_first = calculate_production_first(production.symbols, first_sets)
-
-            can_derive_empty = True
-            for symbol in production.symbols:
-                if symbol == "ε":
-                    continue
-                symbol_first = first_sets.get(symbol, {symbol})
-                if "ε" not in symbol_first:
-                    can_derive_empty = False
-                    break
-
-            directing_set = set()
-            for sym in prod_first:
-                if sym != "ε":
-                    directing_set.add(sym)
-
-            if can_derive_empty or "ε" in prod_first:
-                directing_set.update(follow_sets[nonterminal])
-
-            new_production = Production(symbols=production.symbols,
-                                        first_set=[sym for sym in directing_set if sym != "ε"])
-            new_rule.productions.append(new_production)
+            directing_set, can_derive_empty = production_first_mask(production.ids, first, nullable, bits)
+            if can_derive_empty:
+                directing_set |= follow[nonterminal]
+            new_rule.productions.append(Production(symbols=production.ids, first_set=bits.decode(directing_set)))
 
         new_grammar.rules[nonterminal] = new_rule
 
-    return new_grammar
-
+    return DirectingSetsAnalysis(new_grammar, start_symbol, bits, first, nullable, follow,
+                                 recomputed & grammar.rules.keys())
 
-def calculate_production_first(symbols: list[str], first_sets: dict[str, set[str]]) -> set[str]:
-    if not symbols or symbols[0] == "ε":
-        return {"ε"}
 
-    result = set()
-    all_can_derive_empty = True
+def production_first_mask(symbol_ids: array, first: dict[str, int], nullable: dict[str, bool],
+                          bits: _SymbolBits) -> tuple[int, bool]:
+    if not symbol_ids or symbol_ids[0] == EPSILON_ID:
+        return 0, True
 
-    for symbol in symbols:
-        if symbol == "ε":
+    kinds, names = SYMBOLS.kinds, SYMBOLS.names
+    result = 0
+    for symbol_id in symbol_ids:
+        kind = kinds[symbol_id]
+        if kind == EPSILON:
             continue
-
-        if not (is_nonterminal(symbol)):
-            result.add(symbol)
-            all_can_derive_empty = False
-            break
-
-        symbol_first = first_sets.get(symbol, set())
-        for sym in symbol_first:
-            if sym != "ε":
-                result.add(sym)
-
-        if "ε" not in symbol_first:
-            all_can_derive_empty = False
-            break
-
-    if all_can_derive_empty:
-        result.add("ε")
-
-    return result
+        symbol = names[symbol_id]
+        if kind != NONTERMINAL:
+            return result | bits.bit(symbol), False
+        result |= first.get(symbol, 0)
+        if not nullable.get(symbol, False):
+            return result, False
+
+    return result, True
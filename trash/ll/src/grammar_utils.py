@@ -1,17 +1,56 @@
 import re
+from array import array
 from dataclasses import dataclass
 
+from symbol_table import SYMBOLS
+
+
+def encode_symbols(symbols: list[str] | array) -> array:
+    return symbols if isinstance(symbols, array) else SYMBOLS.encode(symbols)
+
 
-@dataclass
 class Production:
-    symbols: list[str]
-    first_set: list[str]
+    # symbols and first_set decode a new list from the id arrays on every read. Mutating that list does not
+    # change the production: assign a new list instead, and read ids/first_set_ids in loops
+    __slots__ = ("ids", "first_set_ids")
+
+    def __init__(self, symbols: list[str] | array, first_set: list[str] | array):
+        self.ids = encode_symbols(symbols)
+        self.first_set_ids = encode_symbols(first_set)
+
+    @property
+    def symbols(self) -> list[str]:
+        return SYMBOLS.decode(self.ids)
+
+    @symbols.setter
+    def symbols(self, symbols: list[str]) -> None:
+        self.ids = encode_symbols(symbols)
+
+    @property
+    def first_set(self) -> list[str]:
+        return SYMBOLS.decode(self.first_set_ids)
+
+    @first_set.setter
+    def first_set(self, first_set: list[str]) -> None:
+        self.first_set_ids = encode_symbols(first_set)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Production):
+            return NotImplemented
+        return self.ids == other.ids and self.first_set_ids == other.first_set_ids
+
+    def __repr__(self) -> str:
+        return f"Production(symbols={self.symbols!r}, first_set={self.first_set!r})"
+
+    def __reduce__(self):
+        # ids are only meaningful inside this process's SYMBOLS table
+        return Production, (self.symbols, self.first_set)
 
     def add_first_set(self, first_set: list[str]) -> None:
         self.first_set = first_set
 
 
-@dataclass
+@dataclass(slots=True)
 class Rule:
     nonterminal: str
     productions: list[Production]
@@ -20,7 +59,7 @@ class Rule:
         self.productions.append(Production(symbols, first_set))
 
 
-@dataclass
+@dataclass(slots=True)
 class Grammar:
     rules: dict[str, Rule]
 
@@ -1,8 +1,9 @@
 import sys
 from build_parsing_table import build_parsing_table
+from cache import grammar_fingerprint, load_cached, store_cached
 from grammar import calculate_directing_sets
 from grammar_utils import parse_grammar
-from table import write_table
+from table import write_table, write_table_binary
 
 
 def task3(input_path: str):
@@ -11,13 +12,32 @@ def task3(input_path: str):
     return calculate_directing_sets(grammar, axiom_nonterminal)
 
 def task4() -> None:
-    if len(sys.argv) != 3:
-        print(f'Usage: python {sys.argv[0]} <input-file> <output-file>')
+    args = sys.argv[1:]
+    use_cache = "--no-cache" not in args
+    if not use_cache:
+        args.remove("--no-cache")
+    if len(args) != 2:
+        print(f'Usage: python {sys.argv[0]} [--no-cache] <input-file> <output-file>')
         return
+    input_path, output_path = args
 
-    grammar = task3(sys.argv[1])
-    table = build_parsing_table(grammar, list(grammar.rules.keys())[0])
-    write_table(table, sys.argv[2])
+    with open(input_path, "r", encoding="utf-8") as f:
+        grammar, axiom_nonterminal = parse_grammar(f.readlines())
+
+    fingerprint = grammar_fingerprint(grammar, axiom_nonterminal)
+    cached = load_cached(fingerprint) if use_cache else None
+    if cached is None:
+        grammar = calculate_directing_sets(grammar, axiom_nonterminal)
+        table = build_parsing_table(grammar, list(grammar.rules.keys())[0])
+        if use_cache:
+            store_cached(fingerprint, grammar, table)
+    else:
+        grammar, table = cached
+
+    if output_path.endswith(".bin"):
+        write_table_binary(table, output_path)
+    else:
+        write_table(table, output_path)
 
 
 
@@ -0,0 +1,59 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from grammar import (DirectingSetsAnalysis, analyze_directing_sets, factorize_grammar, remove_direct_recursion,
+                     remove_indirect_recursion, remove_unreachable_rules)
+from grammar_utils import Grammar
+
+GrammarPass = Callable[[Grammar, str], Grammar]
+
+DEFAULT_PASSES: list[tuple[str, GrammarPass]] = [
+    ("remove_direct_recursion", lambda grammar, start_symbol: remove_direct_recursion(grammar)),
+    ("remove_indirect_recursion", lambda grammar, start_symbol: remove_indirect_recursion(grammar)),
+    ("factorize_grammar", lambda grammar, start_symbol: factorize_grammar(grammar)),
+    ("remove_unreachable_rules", remove_unreachable_rules),
+]
+
+
+@dataclass
+class PassReport:
+    name: str
+    seconds: float
+    changed: set[str] = field(default_factory=set)
+
+
+def changed_nonterminals(before: Grammar, after: Grammar) -> set[str]:
+    changed = {nonterminal for nonterminal, rule in after.rules.items() if before.rules.get(nonterminal) is not rule}
+    return changed | (before.rules.keys() - after.rules.keys())
+
+
+# The pipeline is incremental only across runs: every pass rewrites the whole grammar on each run,
+# and the directing sets are recomputed just for rules whose signature differs from the previous
+# run's result. The per-pass changed sets are relative to that pass's input and are only reported.
+class GrammarPipeline:
+    def __init__(self, start_symbol: str, passes: list[tuple[str, GrammarPass]] | None = None):
+        self.start_symbol = start_symbol
+        self.passes = DEFAULT_PASSES if passes is None else passes
+        self.reports: list[PassReport] = []
+        self.analysis: DirectingSetsAnalysis | None = None
+
+    def run(self, grammar: Grammar) -> Grammar:
+        self.reports = []
+
+        for name, transform in self.passes:
+            started = time.perf_counter()
+            new_grammar = transform(grammar, self.start_symbol)
+            elapsed = time.perf_counter() - started
+            self.reports.append(PassReport(name, elapsed, changed_nonterminals(grammar, new_grammar)))
+            grammar = new_grammar
+
+        started = time.perf_counter()
+        self.analysis = analyze_directing_sets(grammar, self.start_symbol, self.analysis)
+        elapsed = time.perf_counter() - started
+        self.reports.append(PassReport("calculate_directing_sets", elapsed, self.analysis.recomputed))
+
+        return self.analysis.grammar
+
+    def timings(self) -> dict[str, float]:
+        return {report.name: report.seconds for report in self.reports}
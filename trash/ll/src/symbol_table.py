@@ -0,0 +1,53 @@
+from array import array
+from typing import Iterable
+
+TERMINAL = 0
+NONTERMINAL = 1
+EPSILON = 2
+
+
+def classify(symbol: str) -> int:
+    if symbol == "ε":
+        return EPSILON
+    if symbol.startswith('<') and symbol.endswith('>') and len(symbol) > 2:
+        return NONTERMINAL
+    return TERMINAL
+
+
+class SymbolTable:
+    __slots__ = ("ids", "names", "kinds")
+
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+        self.names: list[str] = []
+        self.kinds = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def intern(self, symbol: str) -> int:
+        symbol_id = self.ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = len(self.names)
+            self.ids[symbol] = symbol_id
+            self.names.append(symbol)
+            self.kinds.append(classify(symbol))
+        return symbol_id
+
+    def encode(self, symbols: Iterable[str]) -> array:
+        ids = self.ids
+        intern = self.intern
+        return array("i", [ids[symbol] if symbol in ids else intern(symbol) for symbol in symbols])
+
+    def decode(self, symbol_ids: Iterable[int]) -> list[str]:
+        names = self.names
+        return [names[symbol_id] for symbol_id in symbol_ids]
+
+    def kind(self, symbol: str) -> int:
+        # Lookup only: asking about a symbol must not add it to the table
+        symbol_id = self.ids.get(symbol)
+        return classify(symbol) if symbol_id is None else self.kinds[symbol_id]
+
+
+SYMBOLS = SymbolTable()
+EPSILON_ID = SYMBOLS.intern("ε")
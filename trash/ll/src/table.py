@@ -1,17 +1,209 @@
 import csv
-from dataclasses import dataclass
+import mmap
+import struct
+import sys
+from array import array
+
+from grammar_utils import encode_symbols
+from symbol_table import SYMBOLS
+
+TABLE_MAGIC = b"LL1T"
+TABLE_VERSION = 1
+# magic, version, mask words per row, rows, terminals, size of the string block
+TABLE_HEADER = struct.Struct("<4sHHIII")
 
 
-@dataclass
 class Line:
-    number: int
-    symbol: str
-    first_set: list[str]
-    shift: bool
-    error: bool
-    pointer: int | None
-    stack: bool
-    end: bool
+    __slots__ = ("number", "symbol", "first_set_ids", "shift", "error", "pointer", "stack", "end")
+
+    def __init__(self, number: int, symbol: str, first_set: list[str] | array, shift: bool, error: bool,
+                 pointer: int | None, stack: bool, end: bool):
+        self.number = number
+        self.symbol = symbol
+        self.first_set_ids = encode_symbols(first_set)
+        self.shift = shift
+        self.error = error
+        self.pointer = pointer
+        self.stack = stack
+        self.end = end
+
+    @property
+    def first_set(self) -> list[str]:
+        # A decoded copy of first_set_ids; changes to it are not stored back
+        return SYMBOLS.decode(self.first_set_ids)
+
+    @first_set.setter
+    def first_set(self, first_set: list[str]) -> None:
+        self.first_set_ids = encode_symbols(first_set)
+
+    def _fields(self) -> tuple:
+        return self.number, self.symbol, self.first_set, self.shift, self.error, self.pointer, self.stack, self.end
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Line):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    def __repr__(self) -> str:
+        return (f"Line(number={self.number!r}, symbol={self.symbol!r}, first_set={self.first_set!r}, "
+                f"shift={self.shift!r}, error={self.error!r}, pointer={self.pointer!r}, stack={self.stack!r}, "
+                f"end={self.end!r})")
+
+    def __reduce__(self):
+        # first_set_ids are only meaningful inside this process's SYMBOLS table
+        return Line, self._fields()
+
+
+class CompiledTable:
+    __slots__ = ("terminal_ids", "terminal_bits", "symbols", "first_sets", "first_set_masks", "pointer", "shift",
+                 "error", "stack", "end", "defined")
+
+    def __init__(self, size: int):
+        self.terminal_ids: dict[str, int] = {}
+        self.terminal_bits: dict[str, int] = {}
+        self.symbols: list[str | None] = [None] * size
+        self.first_sets: list[list[str]] | _DirectingSets = [[] for _ in range(size)]
+        self.first_set_masks: list[int] = [0] * size
+        self.pointer = array("i", [-1]) * size
+        self.shift = bytearray(size)
+        self.error = bytearray(size)
+        self.stack = bytearray(size)
+        self.end = bytearray(size)
+        self.defined = bytearray(size)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __reduce__(self):
+        return load_compiled_table, (dump_compiled_table(self),)
+
+    def intern(self, terminal: str) -> int:
+        terminal_id = self.terminal_ids.get(terminal)
+        if terminal_id is None:
+            terminal_id = len(self.terminal_ids)
+            self.terminal_ids[terminal] = terminal_id
+            self.terminal_bits[terminal] = 1 << terminal_id
+        return terminal_id
+
+    def mask_of(self, terminals: list[str]) -> int:
+        mask = 0
+        for terminal in terminals:
+            mask |= 1 << self.intern(terminal)
+        return mask
+
+
+def compile_table(table: list[Line]) -> CompiledTable:
+    compiled = CompiledTable(max((line.number for line in table), default=-1) + 1)
+
+    for line in table:
+        number = line.number
+        compiled.symbols[number] = line.symbol
+        compiled.first_set_masks[number] = compiled.mask_of(line.first_set)
+        compiled.pointer[number] = -1 if line.pointer is None else line.pointer
+        compiled.shift[number] = line.shift
+        compiled.error[number] = line.error
+        compiled.stack[number] = line.stack
+        compiled.end[number] = line.end
+        compiled.defined[number] = True
+
+    compiled.first_sets = _DirectingSets(compiled.first_set_masks, list(compiled.terminal_ids))
+    return compiled
+
+
+class _DirectingSets:
+    __slots__ = ("masks", "terminals")
+
+    def __init__(self, masks, terminals: list[str]):
+        self.masks = masks
+        self.terminals = terminals
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def __getitem__(self, number: int) -> list[str]:
+        mask = self.masks[number]
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(self.terminals[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % 8)
+
+
+def dump_compiled_table(table: CompiledTable) -> bytes:
+    rows = len(table)
+    terminals = list(table.terminal_ids)
+    mask_words = (len(terminals) + 63) // 64
+    strings = "\n".join(terminals + [symbol or "" for symbol in table.symbols]).encode("utf-8")
+
+    pointer = array("i", table.pointer)
+    if sys.byteorder != "little":
+        pointer.byteswap()
+
+    parts = [TABLE_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, mask_words, rows, len(terminals), len(strings)),
+             strings, _padding(TABLE_HEADER.size + len(strings))]
+    parts.extend(mask.to_bytes(mask_words * 8, "little") for mask in table.first_set_masks)
+    parts.append(pointer.tobytes())
+    parts.extend(bytes(flags) for flags in (table.shift, table.error, table.stack, table.end, table.defined))
+    return b"".join(parts)
+
+
+def load_compiled_table(buffer) -> CompiledTable:
+    view = memoryview(buffer)
+    magic, version, mask_words, rows, terminal_count, strings_size = TABLE_HEADER.unpack_from(view)
+    if magic != TABLE_MAGIC or version != TABLE_VERSION:
+        raise ValueError(f"Unsupported table format: {bytes(magic)!r} v{version}")
+
+    offset = TABLE_HEADER.size
+    names = str(view[offset:offset + strings_size], "utf-8").split("\n") if strings_size else [""]
+    offset += strings_size + len(_padding(offset + strings_size))
+    terminals = names[:terminal_count]
+
+    masks_size = rows * mask_words * 8
+    masks_view = view[offset:offset + masks_size]
+    if mask_words == 0:
+        masks = [0] * rows
+    elif mask_words == 1 and sys.byteorder == "little":
+        masks = masks_view.cast("Q")
+    else:
+        width = mask_words * 8
+        masks = [int.from_bytes(masks_view[i:i + width], "little") for i in range(0, masks_size, width)]
+    offset += masks_size
+
+    if sys.byteorder == "little":
+        pointer = view[offset:offset + rows * 4].cast("i")
+    else:
+        pointer = array("i", view[offset:offset + rows * 4])
+        pointer.byteswap()
+    offset += rows * 4
+
+    compiled = CompiledTable.__new__(CompiledTable)
+    compiled.terminal_ids = {terminal: i for i, terminal in enumerate(terminals)}
+    compiled.terminal_bits = {terminal: 1 << i for i, terminal in enumerate(terminals)}
+    compiled.first_set_masks = masks
+    compiled.first_sets = _DirectingSets(masks, terminals)
+    compiled.pointer = pointer
+    compiled.shift, compiled.error, compiled.stack, compiled.end, compiled.defined = (
+        view[offset + i * rows:offset + (i + 1) * rows] for i in range(5))
+    compiled.symbols = [symbol if compiled.defined[i] else None
+                        for i, symbol in enumerate(names[terminal_count:terminal_count + rows])]
+    return compiled
+
+
+def write_table_binary(table: list[Line] | CompiledTable, output_path) -> None:
+    if not isinstance(table, CompiledTable):
+        table = compile_table(table)
+    with open(output_path, "wb") as file:
+        file.write(dump_compiled_table(table))
+
+
+def read_table_binary(input_path) -> CompiledTable:
+    with open(input_path, "rb") as file:
+        return load_compiled_table(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
 
 
 def write_table(table: list[Line], output_path) -> None:
@@ -23,15 +215,16 @@ def write_table(table: list[Line], output_path) -> None:
                 "+" if line.error else "-", line.pointer, "+" if line.stack else "-", "+" if line.end else "-"])
 
 
-def read_table() -> list[Line]:
-    with open("table.csv", "r", encoding="utf-8", newline="") as file:
+def read_table(input_path="table.csv") -> list[Line]:
+    with open(input_path, "r", encoding="utf-8", newline="") as file:
         reader = csv.reader(file, delimiter=";")
+        next(reader, None)
         table = []
         for row in reader:
             pointer_str = row[5].strip()
             pointer = int(pointer_str) if pointer_str else None
 
             table.append(
-                Line(number=int(row[0]), symbol=row[1], first_set=row[2].split() if row[2] else [], shift=row[3] == "+",
+                Line(number=int(row[0]), symbol=row[1], first_set=row[2].split(",") if row[2] else [], shift=row[3] == "+",
                     error=row[4] == "+", pointer=pointer, stack=row[6] == "+", end=row[7] == "+"))
         return table
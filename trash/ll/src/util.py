@@ -1,2 +1,5 @@
+from symbol_table import NONTERMINAL, SYMBOLS
+
+
 def is_nonterminal(symbol: str) -> bool:
-    return symbol.startswith('<') and symbol.endswith('>') and len(symbol) > 2
+    return SYMBOLS.kind(symbol) == NONTERMINAL
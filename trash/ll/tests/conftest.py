@@ -0,0 +1,30 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from build_parsing_table import build_parsing_table
+from grammar import (calculate_directing_sets, factorize_grammar, remove_direct_recursion, remove_indirect_recursion,
+                     remove_unreachable_rules)
+from grammar_utils import parse_grammar
+
+DATA = Path(__file__).parent / "data"
+
+
+def build_table(name: str):
+    with open(DATA / f"{name}.txt", encoding="utf-8") as file:
+        grammar, axiom = parse_grammar(file.readlines())
+    grammar = remove_direct_recursion(grammar)
+    grammar = remove_indirect_recursion(grammar)
+    grammar = factorize_grammar(grammar)
+    grammar = remove_unreachable_rules(grammar, axiom)
+    grammar = calculate_directing_sets(grammar, axiom)
+    return build_parsing_table(grammar, axiom)
+
+
+@pytest.fixture(name="build_table", scope="session")
+def build_table_fixture():
+    return build_table
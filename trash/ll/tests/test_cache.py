@@ -0,0 +1,80 @@
+import os
+import pickle
+
+from cache import DiskCache, grammar_fingerprint, load_cached, store_cached
+from grammar_utils import parse_grammar
+
+
+class Unpicklable:
+    def __reduce__(self):
+        raise pickle.PicklingError("not today")
+
+
+def test_round_trip(tmp_path):
+    grammar, axiom = parse_grammar(["<S> -> <A> #", "<A> -> a"])
+    fingerprint = grammar_fingerprint(grammar, axiom)
+    assert load_cached(fingerprint, str(tmp_path)) is None
+
+    store_cached(fingerprint, grammar, [], str(tmp_path))
+    cached_grammar, table = load_cached(fingerprint, str(tmp_path))
+    assert cached_grammar == grammar and table == []
+
+
+def test_fingerprint_depends_on_grammar_format_and_code(tmp_path):
+    grammar, axiom = parse_grammar(["<S> -> <A> #", "<A> -> a"])
+    other, _ = parse_grammar(["<S> -> <A> #", "<A> -> b"])
+    assert grammar_fingerprint(grammar, axiom) != grammar_fingerprint(other, axiom)
+
+    keys = {DiskCache(str(tmp_path), version, code).fingerprint("x") for version, code in ((1, ""), (2, ""), (1, "c"))}
+    assert len(keys) == 3
+
+
+def test_failed_store_leaves_no_files(tmp_path):
+    cache = DiskCache(str(tmp_path), 1)
+    cache.store("key", Unpicklable())
+    assert os.listdir(tmp_path) == []
+    assert cache.load("key") is None
+
+
+def test_broken_entries_are_misses(tmp_path):
+    cache = DiskCache(str(tmp_path), 1)
+
+    with open(cache.path("truncated"), "wb") as file:
+        file.write(pickle.dumps((1, list(range(100))))[:-5])
+    assert cache.load("truncated") is None
+
+    # A pickle that refers to a module that no longer exists
+    with open(cache.path("moved"), "wb") as file:
+        file.write(b"cmissing_module\nCls\n.")
+    assert cache.load("moved") is None
+
+    cache.store("old", "value")
+    assert DiskCache(str(tmp_path), 2).load("old") is None
+    assert cache.load("old") == "value"
+
+
+def test_disabled_cache_touches_nothing(tmp_path):
+    directory = tmp_path / "cache"
+    cache = DiskCache(str(directory), 1, enabled=False)
+    cache.store("key", "value")
+    assert not directory.exists()
+    assert cache.load("key") is None
+
+
+def test_main_without_cache(tmp_path, monkeypatch):
+    import cache
+    import main
+
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(main, "load_cached", lambda fingerprint: cache.load_cached(fingerprint, cache.CACHE_DIR))
+    monkeypatch.setattr(main, "store_cached", lambda *args: cache.store_cached(*args, cache_dir=cache.CACHE_DIR))
+    source = tmp_path / "grammar.txt"
+    source.write_text("<S> -> <A> #\n<A> -> a\n", encoding="utf-8")
+
+    monkeypatch.setattr("sys.argv", ["main.py", "--no-cache", str(source), str(tmp_path / "table.csv")])
+    main.task4()
+    assert (tmp_path / "table.csv").exists() and not (tmp_path / "cache").exists()
+
+    monkeypatch.setattr("sys.argv", ["main.py", str(source), str(tmp_path / "table.csv")])
+    main.task4()
+    assert len(os.listdir(tmp_path / "cache")) == 1
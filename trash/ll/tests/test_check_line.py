@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from check_line import CheckStatus, check_line, check_lines, check_tokens
+from table import compile_table, read_table_binary, write_table_binary
+
+DATA = Path(__file__).parent / "data"
+
+
+@pytest.fixture(scope="module")
+def table(build_table):
+    return build_table("expressions")
+
+
+@pytest.fixture(scope="module")
+def cases():
+    with open(DATA / "expressions_check.json", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def assert_matches_reference(result, case):
+    # The baseline printed the directing set in set order, so only its contents are compared
+    if case["expected"] is None:
+        assert str(result) == case["message"]
+    else:
+        assert result.status is CheckStatus.UNEXPECTED_SYMBOL
+        assert str(result) == f"{case['message']} not in {result.expected}"
+        assert sorted(result.expected) == case["expected"]
+
+
+def test_messages_match_baseline(table, cases):
+    compiled = compile_table(table)
+    for case in cases:
+        assert_matches_reference(check_line(case["tokens"], table), case)
+        assert_matches_reference(check_line(case["tokens"], compiled), case)
+
+
+def test_row_tables_are_not_compiled_per_line(table, cases, monkeypatch):
+    import check_line as module
+
+    compiled = compile_table(table)
+    monkeypatch.setattr(module, "compile_table", None)
+    for case in cases:
+        rows, packed = check_line(case["tokens"], table), check_line(case["tokens"], compiled)
+        assert (rows.status, rows.index, rows.position, rows.symbol) == \
+               (packed.status, packed.index, packed.position, packed.symbol)
+        assert sorted(rows.expected) == sorted(packed.expected)
+
+
+def test_streaming_matches_lists(table, cases):
+    compiled = compile_table(table)
+    for case in cases:
+        assert_matches_reference(check_tokens(iter(case["tokens"]), compiled), case)
+
+
+def test_binary_table_gives_same_results(table, cases, tmp_path):
+    write_table_binary(table, tmp_path / "table.bin")
+    loaded = read_table_binary(tmp_path / "table.bin")
+    for case in cases:
+        assert_matches_reference(check_line(case["tokens"], loaded), case)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_matches_single_lines(table, cases, workers):
+    lines = [case["tokens"] for case in cases]
+    results = list(check_lines(lines, table, workers=workers, chunk_size=16))
+    assert len(results) == len(cases)
+    for result, case in zip(results, cases):
+        assert_matches_reference(result, case)
+
+    unordered = dict(check_lines(lines, table, workers=workers, chunk_size=16, ordered=False))
+    assert [str(unordered[i]) for i in range(len(lines))] == [str(result) for result in results]
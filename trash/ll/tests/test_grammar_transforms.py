@@ -0,0 +1,165 @@
+import random
+
+import pytest
+
+from check_line import check_line
+from conftest import DATA
+from grammar import (build_dependency_graph, calculate_directing_sets, factorize_grammar, remove_direct_recursion,
+                     remove_indirect_recursion, strongly_connected_components)
+from grammar_utils import parse_grammar
+from util import is_nonterminal
+
+
+def load(name: str):
+    with open(DATA / f"{name}.txt", encoding="utf-8") as file:
+        return parse_grammar(file.readlines())
+
+
+def derive(rules, symbol: str, rnd: random.Random, depth: int) -> list[str]:
+    if not is_nonterminal(symbol):
+        return [] if symbol == "ε" else [symbol]
+    bodies = [production.symbols for production in rules[symbol].productions]
+    if depth <= 0:
+        # Past the depth limit only take the shortest alternative, so derivations always terminate
+        bodies = [min(bodies, key=lambda body: sum(map(is_nonterminal, body)))]
+    return [token for part in rnd.choice(bodies) for token in derive(rules, part, rnd, depth - 1)]
+
+
+@pytest.mark.parametrize("name", ["expressions", "indirect"])
+def test_transformed_table_accepts_sentences_of_original_grammar(name, build_table):
+    grammar, axiom = load(name)
+    table = build_table(name)
+    rnd = random.Random(0)
+    for _ in range(200):
+        sentence = derive(grammar.rules, axiom, rnd, 6)
+        assert str(check_line(sentence, table)) == "Ok", sentence
+
+
+def test_statement_sentences(build_table):
+    table = build_table("statements")
+    for sentence in ["begin end #", "begin id := id ; end #", "begin id ( ) ; id ( num , id [ num ] ) ; end #",
+                     "begin if id then if num then id ( ) ; end #"]:
+        assert str(check_line(sentence.split(), table)) == "Ok", sentence
+    assert str(check_line("begin id := ; end #".split(), table)).startswith("Error at index 3")
+
+
+@pytest.mark.parametrize("name", ["expressions", "statements", "indirect"])
+def test_no_left_recursion_or_common_prefixes_remain(name):
+    grammar, _ = load(name)
+    grammar = factorize_grammar(remove_indirect_recursion(remove_direct_recursion(grammar)))
+
+    graph = build_dependency_graph(grammar)
+    assert all(len(component) == 1 for component in strongly_connected_components(graph))
+    assert all(nonterminal not in targets for nonterminal, targets in graph.items())
+    for rule in grammar.rules.values():
+        heads = [production.symbols[0] for production in rule.productions if production.symbols]
+        assert len(heads) == len(set(heads)), rule.nonterminal
+
+
+def language(grammar, start_symbol: str, max_length: int) -> set[tuple[str, ...]]:
+    # All sentences of at most max_length terminals, as a fixed point over the rules
+    sentences = {nonterminal: set() for nonterminal in grammar.rules}
+    changed = True
+    while changed:
+        changed = False
+        for nonterminal, rule in grammar.rules.items():
+            for production in rule.productions:
+                prefixes = {()}
+                for symbol in production.symbols:
+                    if symbol == "ε":
+                        continue
+                    parts = sentences[symbol] if symbol in grammar.rules else {(symbol,)}
+                    prefixes = {prefix + part for prefix in prefixes for part in parts
+                                if len(prefix) + len(part) <= max_length}
+                if not prefixes <= sentences[nonterminal]:
+                    sentences[nonterminal] |= prefixes
+                    changed = True
+    return sentences[start_symbol]
+
+
+def test_recursion_helpers_do_not_overwrite_each_other():
+    # Direct removal creates <Ar>; splitting <A> again in the indirect pass must pick another name
+    grammar, axiom = parse_grammar(["<S> -> <A> #", "<A> -> <A> <A> b", "<A> -> a <A>", "<A> -> ε"])
+    transformed = remove_indirect_recursion(remove_direct_recursion(grammar))
+    assert ("a", "b", "a", "b", "#") in language(transformed, axiom, 7)
+    assert language(transformed, axiom, 7) == language(grammar, axiom, 7)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_recursion_removal_keeps_language(seed):
+    grammar, axiom = parse_grammar(random_grammar_lines(random.Random(seed)))
+    transformed = remove_indirect_recursion(remove_direct_recursion(grammar))
+    assert language(transformed, axiom, 6) == language(grammar, axiom, 6)
+
+
+def reference_directing_sets(grammar, start_symbol: str) -> dict[str, list[list[str]]]:
+    # Textbook fixed-point FIRST/FOLLOW, with the end marker taken from the start rule like the analysis does
+    first = {nonterminal: set() for nonterminal in grammar.rules}
+    nullable = {nonterminal: False for nonterminal in grammar.rules}
+
+    def first_of(symbols):
+        result = set()
+        for symbol in symbols:
+            if symbol == "ε":
+                continue
+            if symbol not in grammar.rules:
+                return result | {symbol}, False
+            result |= first[symbol]
+            if not nullable[symbol]:
+                return result, False
+        return result, True
+
+    changed = True
+    while changed:
+        changed = False
+        for nonterminal, rule in grammar.rules.items():
+            for production in rule.productions:
+                symbols, empty = first_of(production.symbols)
+                if not symbols <= first[nonterminal] or (empty and not nullable[nonterminal]):
+                    first[nonterminal] |= symbols
+                    nullable[nonterminal] = nullable[nonterminal] or empty
+                    changed = True
+
+    follow = {nonterminal: set() for nonterminal in grammar.rules}
+    follow[start_symbol].add(grammar.rules[start_symbol].productions[0].symbols[-1])
+    changed = True
+    while changed:
+        changed = False
+        for nonterminal, rule in grammar.rules.items():
+            for production in rule.productions:
+                symbols = production.symbols
+                for i, symbol in enumerate(symbols):
+                    if symbol not in grammar.rules:
+                        continue
+                    rest, empty = first_of(symbols[i + 1:])
+                    new = rest | (follow[nonterminal] if empty else set())
+                    if not new <= follow[symbol]:
+                        follow[symbol] |= new
+                        changed = True
+
+    result = {}
+    for nonterminal, rule in grammar.rules.items():
+        result[nonterminal] = []
+        for production in rule.productions:
+            symbols, empty = first_of(production.symbols)
+            result[nonterminal].append(sorted(symbols | (follow[nonterminal] if empty else set())))
+    return result
+
+
+def random_grammar_lines(rnd: random.Random) -> list[str]:
+    nonterminals = [f"<N{i}>" for i in range(rnd.randint(1, 6))]
+    lines = [f"<S> -> {nonterminals[0]} #"]
+    for nonterminal in nonterminals:
+        for _ in range(rnd.randint(1, 3)):
+            body = [rnd.choice(nonterminals) if rnd.random() < 0.4 else rnd.choice("abcd")
+                    for _ in range(rnd.randint(0, 3))]
+            lines.append(f"{nonterminal} -> {' '.join(body) or 'ε'}")
+    return lines
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_directing_sets_match_reference(seed):
+    grammar, axiom = parse_grammar(random_grammar_lines(random.Random(seed)))
+    analysed = calculate_directing_sets(grammar, axiom)
+    assert {nonterminal: [sorted(production.first_set) for production in rule.productions]
+            for nonterminal, rule in analysed.rules.items()} == reference_directing_sets(grammar, axiom)
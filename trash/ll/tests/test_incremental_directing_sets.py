@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+from grammar import analyze_directing_sets
+from grammar_utils import parse_grammar
+
+
+def make_grammar(rules: dict[str, list[list[str]]]):
+    lines = [f"{nonterminal} -> {' '.join(body) or 'ε'}" for nonterminal, bodies in rules.items() for body in bodies]
+    return parse_grammar(lines)
+
+
+def decoded(analysis, masks: dict[str, int]) -> dict[str, list[str]]:
+    # Bit numbering is private to each analysis, so masks are compared as symbol names
+    return {nonterminal: sorted(analysis.bits.decode(mask)) for nonterminal, mask in masks.items()}
+
+
+def assert_same_analysis(incremental, full):
+    assert decoded(incremental, incremental.first) == decoded(full, full.first)
+    assert incremental.nullable == full.nullable
+    assert decoded(incremental, incremental.follow) == decoded(full, full.follow)
+    assert directing_sets(incremental) == directing_sets(full)
+
+
+def directing_sets(analysis) -> dict[str, list[tuple[list[str], list[str]]]]:
+    return {nonterminal: [(production.symbols, sorted(production.first_set)) for production in rule.productions]
+            for nonterminal, rule in analysis.grammar.rules.items()}
+
+
+def assert_incremental_matches_full(previous_rules, rules):
+    grammar, axiom = make_grammar(previous_rules)
+    previous = analyze_directing_sets(grammar, axiom)
+
+    grammar, axiom = make_grammar(rules)
+    incremental = analyze_directing_sets(grammar, axiom, previous)
+    full = analyze_directing_sets(grammar, axiom)
+
+    assert_same_analysis(incremental, full)
+    return incremental
+
+
+BASE = {
+    "<S>": [["<E>", "#"]],
+    "<E>": [["<T>", "<E'>"]],
+    "<E'>": [["+", "<T>", "<E'>"], []],
+    "<T>": [["<F>", "<T'>"]],
+    "<T'>": [["*", "<F>", "<T'>"], []],
+    "<F>": [["(", "<E>", ")"], ["id"]],
+}
+
+
+def test_removed_rule_invalidates_users():
+    incremental = assert_incremental_matches_full({"<S>": [["<A>", "x"]], "<A>": [["a"], ["b"]]},
+                                                  {"<S>": [["<A>", "x"]]})
+    assert decoded(incremental, incremental.first) == {"<S>": []}
+    assert directing_sets(incremental) == {"<S>": [(["<A>", "x"], [])]}
+
+
+@pytest.mark.parametrize("rules", [
+    {**BASE, "<F>": [["(", "<E>", ")"], ["id"], ["<G>"]], "<G>": [["num"], []]},
+    {**BASE, "<T'>": [["*", "<F>", "<T'>"], ["/", "<F>", "<T'>"], []]},
+    {**BASE, "<E'>": [["+", "<T>", "<E'>"]]},
+    {key: value for key, value in BASE.items() if key != "<T'>"},
+    {key: value for key, value in BASE.items() if key != "<F>"},
+], ids=["add", "modify", "drop-epsilon", "remove-nullable", "remove-leaf"])
+def test_single_change(rules):
+    assert_incremental_matches_full(BASE, rules)
+
+
+def random_rules(rnd: random.Random, nonterminals: list[str]) -> dict[str, list[list[str]]]:
+    return {"<S>": [[nonterminals[0], "#"]],
+            **{nonterminal: [random_body(rnd, nonterminals) for _ in range(rnd.randint(1, 3))]
+               for nonterminal in nonterminals}}
+
+
+def random_body(rnd: random.Random, nonterminals: list[str]) -> list[str]:
+    return [rnd.choice(nonterminals) if rnd.random() < 0.5 else rnd.choice("abcde") for _ in range(rnd.randint(0, 3))]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_edit_sequences(seed):
+    rnd = random.Random(seed)
+    names = [f"<N{i}>" for i in range(8)]
+    rules = random_rules(rnd, names[:5])
+
+    grammar, axiom = make_grammar(rules)
+    analysis = analyze_directing_sets(grammar, axiom)
+    for _ in range(10):
+        rules = {nonterminal: [list(body) for body in bodies] for nonterminal, bodies in rules.items()}
+        editable = [nonterminal for nonterminal in rules if nonterminal != "<S>"]
+        action = rnd.choice(["add", "remove", "modify"])
+        if action == "add":
+            new = rnd.choice(names)
+            rules.setdefault(new, []).append(random_body(rnd, names))
+            rules[rnd.choice(editable)].append([new])
+        elif action == "remove" and len(editable) > 1:
+            del rules[rnd.choice(editable)]
+        else:
+            bodies = rules[rnd.choice(editable)]
+            bodies[rnd.randrange(len(bodies))] = random_body(rnd, names)
+
+        grammar, axiom = make_grammar(rules)
+        analysis = analyze_directing_sets(grammar, axiom, analysis)
+        full = analyze_directing_sets(grammar, axiom)
+        assert_same_analysis(analysis, full)
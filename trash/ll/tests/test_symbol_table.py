@@ -0,0 +1,18 @@
+from symbol_table import EPSILON, NONTERMINAL, SYMBOLS, TERMINAL
+from util import is_nonterminal
+
+
+def test_predicates_do_not_intern():
+    size = len(SYMBOLS)
+    assert is_nonterminal("<never-seen-nonterminal>")
+    assert not is_nonterminal("never-seen-terminal")
+    assert SYMBOLS.kind("never-seen-terminal") == TERMINAL
+    assert len(SYMBOLS) == size
+    assert "<never-seen-nonterminal>" not in SYMBOLS.ids
+
+
+def test_kind_of_known_and_unknown_symbols_agree():
+    for symbol, kind in (("<E>", NONTERMINAL), ("id", TERMINAL), ("ε", EPSILON), ("<>", TERMINAL)):
+        before = SYMBOLS.kind(symbol)
+        SYMBOLS.intern(symbol)
+        assert before == SYMBOLS.kind(symbol) == kind
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+from table import compile_table, read_table, read_table_binary, write_table, write_table_binary
+
+DATA = Path(__file__).parent / "data"
+# expressions.csv and statements.csv are the baseline output. The baseline left indirect.txt left-recursive,
+# so that reference holds the corrected table
+GRAMMARS = ["expressions", "statements", "indirect"]
+
+
+def read_text(path: Path) -> str:
+    with open(path, encoding="utf-8", newline="") as file:
+        return file.read()
+
+
+@pytest.mark.parametrize("name", GRAMMARS)
+def test_table_matches_reference(name, tmp_path, build_table):
+    write_table(build_table(name), tmp_path / "table.csv")
+    assert read_text(tmp_path / "table.csv") == read_text(DATA / f"{name}.csv")
+
+
+# Directing sets are joined with "," in the CSV, so statements.txt (which has a "," terminal) cannot be read back
+@pytest.mark.parametrize("name", ["expressions", "indirect"])
+def test_csv_round_trip(name, tmp_path, build_table):
+    table = build_table(name)
+    write_table(table, tmp_path / "table.csv")
+    assert [(line.number, line.symbol, sorted(line.first_set), line.shift, line.error, line.pointer, line.stack,
+             line.end) for line in read_table(tmp_path / "table.csv")] == \
+           [(line.number, line.symbol, sorted(line.first_set), line.shift, line.error, line.pointer, line.stack,
+             line.end) for line in table]
+
+
+@pytest.mark.parametrize("name", GRAMMARS)
+def test_binary_round_trip(name, tmp_path, build_table):
+    compiled = compile_table(build_table(name))
+    write_table_binary(compiled, tmp_path / "table.bin")
+    loaded = read_table_binary(tmp_path / "table.bin")
+
+    assert len(loaded) == len(compiled)
+    assert loaded.symbols == compiled.symbols
+    assert loaded.terminal_ids == compiled.terminal_ids
+    assert list(loaded.first_set_masks) == list(compiled.first_set_masks)
+    assert [loaded.first_sets[i] for i in range(len(loaded))] == [compiled.first_sets[i] for i in range(len(compiled))]
+    assert list(loaded.pointer) == list(compiled.pointer)
+    for flags in ("shift", "error", "stack", "end", "defined"):
+        assert bytes(getattr(loaded, flags)) == bytes(getattr(compiled, flags))
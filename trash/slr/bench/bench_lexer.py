@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from bench_parser import generate_program
+from lexer import Lexer, get_automata
+
+
+def lex_file(path: str) -> int:
+    lexer = Lexer(path)
+    count = 0
+    while lexer.next_token() is not None:
+        count += 1
+    lexer.close()
+    return count
+
+
+def main() -> None:
+    # Размеры исходников в мегабайтах; время должно расти линейно
+    sizes = [float(arg) for arg in sys.argv[1:]] or [0.5, 1, 2, 4]
+    get_automata()
+    statements_per_mb = 1000 * 1024 * 1024 // len(generate_program(1000))
+
+    for size in sizes:
+        with tempfile.NamedTemporaryFile("w", suffix=".pas", delete=False, encoding="utf-8") as source:
+            source.write(generate_program(int(size * statements_per_mb)))
+        try:
+            megabytes = os.path.getsize(source.name) / (1024 * 1024)
+            started = time.perf_counter()
+            count = lex_file(source.name)
+            elapsed = time.perf_counter() - started
+            print(f"source={megabytes:.2f}MiB lexemes={count} time={elapsed:.3f}s "
+                  f"MiB/s={megabytes / elapsed:.2f} lexemes/s={count / elapsed:,.0f}")
+        finally:
+            os.unlink(source.name)
+
+
+if __name__ == "__main__":
+    main()
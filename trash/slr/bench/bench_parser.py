@@ -0,0 +1,104 @@
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from CompileTable import compile_table
+from CreateTable import create_table
+from Parser import parse_file, parse_tokens
+from ReadGrammar import read_grammar
+from lexer import Lexer
+from main import generate_token_types_name_from_file
+
+GRAMMAR = """
+prog -> PROGRAM IDENTIFIER SEMICOLON block DOT #
+block -> BEGIN stmts END
+stmts -> stmt | stmts SEMICOLON stmt
+stmt -> IDENTIFIER ASSIGN expr | block | WHILE expr DO stmt | WRITE LEFT_PAREN args RIGHT_PAREN
+args -> expr | args COMMA expr
+expr -> expr PLUS term | expr MINUS term | term
+term -> term MULTIPLICATION factor | term DIV factor | factor
+factor -> IDENTIFIER | INTEGER | LEFT_PAREN expr RIGHT_PAREN | MINUS factor
+"""
+
+NAMES = ["x", "y", "sum", "val", "k"]
+
+
+def generate_expression(rnd: random.Random, depth: int) -> str:
+    if depth == 0:
+        return rnd.choice(NAMES) if rnd.random() < 0.6 else str(rnd.randint(0, 999))
+    kind = rnd.randrange(4)
+    if kind == 0:
+        return f"{generate_expression(rnd, depth - 1)} + {generate_expression(rnd, depth - 1)}"
+    if kind == 1:
+        return f"{generate_expression(rnd, depth - 1)} * {generate_expression(rnd, depth - 1)}"
+    if kind == 2:
+        return f"({generate_expression(rnd, depth - 1)})"
+    return f"-{generate_expression(rnd, depth - 1)}"
+
+
+def generate_statement(rnd: random.Random, depth: int, indent: str) -> str:
+    kind = rnd.randrange(5) if depth > 0 else 0
+    if kind == 1:
+        body = ";\n".join(generate_statement(rnd, depth - 1, indent + "  ") for _ in range(rnd.randint(1, 3)))
+        return f"{indent}BEGIN\n{body}\n{indent}END"
+    if kind == 2:
+        return f"{indent}WHILE {generate_expression(rnd, 2)} DO\n{generate_statement(rnd, depth - 1, indent + '  ')}"
+    if kind == 3:
+        args = ", ".join(generate_expression(rnd, 1) for _ in range(rnd.randint(1, 3)))
+        return f"{indent}WRITE({args})"
+    return f"{indent}{rnd.choice(NAMES)} := {generate_expression(rnd, rnd.randint(1, 3))}"
+
+
+def generate_program(statements: int, seed: int = 0) -> str:
+    rnd = random.Random(seed)
+    body = ";\n".join(generate_statement(rnd, 3, "  ") for _ in range(statements))
+    return f"PROGRAM bench;\nBEGIN\n{body}\nEND.\n"
+
+
+def main() -> None:
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    grammar = read_grammar(io.StringIO(GRAMMAR), generate_token_types_name_from_file())
+    table = create_table(grammar)
+    compiled = compile_table(table, grammar)
+    packed = compile_table(table, grammar, compress=True)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".pas", delete=False, encoding="utf-8") as source:
+        source.write(generate_program(statements))
+    try:
+        size = os.path.getsize(source.name)
+
+        started = time.perf_counter()
+        lexer = Lexer(source.name)
+        tokens = list(iter(lexer.next_token, None))
+        lexer.close()
+        lexing = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = parse_tokens(tokens, compiled)
+        parsing = time.perf_counter() - started
+
+        started = time.perf_counter()
+        parse_tokens(tokens, packed)
+        parsing_packed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        parse_file(source.name, compiled)
+        total = time.perf_counter() - started
+
+        print(f"source={size / 1024:.0f}KiB tokens={result.tokens} result: {result}")
+        print(f"lexer:        {lexing:.3f}s lexemes/s={len(tokens) / lexing:,.0f} (with spaces and comments)")
+        print(f"parser dense: {parsing:.3f}s tokens/s={result.tokens / parsing:,.0f} table={compiled.nbytes()}B")
+        print(f"parser comb:  {parsing_packed:.3f}s tokens/s={result.tokens / parsing_packed:,.0f} "
+              f"table={packed.nbytes()}B")
+        print(f"lexer+parser: {total:.3f}s tokens/s={result.tokens / total:,.0f}")
+    finally:
+        os.unlink(source.name)
+
+
+if __name__ == "__main__":
+    main()
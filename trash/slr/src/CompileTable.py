@@ -0,0 +1,195 @@
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from Table import Table, END_SYMBOL_IN_TABLE
+from Rule import Grammar, END_SYMBOL, index_grammar
+from ReadGrammar import AmbiguousGrammarError
+
+OK_SYMBOL = "OK"
+# Значение перехода по стартовому нетерминалу из начального состояния
+ACCEPT = -1
+EMPTY = 0
+
+
+@dataclass
+class PackedRows:
+    """
+    Разреженная матрица состояния x символы в плоском массиве.
+    Ячейка (state, column) лежит в values[base[state] + column].
+    В плотном виде base[state] = state * width и check не нужен;
+    в сжатом (row displacement) строки сдвинуты друг на друга, а check
+    хранит номер состояния - владельца ячейки.
+    """
+    base: array
+    values: array
+    check: Optional[array] = None
+
+    def get(self, state: int, column: int) -> int:
+        index = self.base[state] + column
+        if self.check is not None and (index >= len(self.check) or self.check[index] != state):
+            return EMPTY
+        return self.values[index]
+
+    def nbytes(self) -> int:
+        total = self.base.itemsize * len(self.base) + self.values.itemsize * len(self.values)
+        if self.check is not None:
+            total += self.check.itemsize * len(self.check)
+        return total
+
+
+Row = List[Tuple[int, int]]
+
+
+def pack_dense(rows: List[Row], width: int) -> PackedRows:
+    values = array('i', [EMPTY]) * (len(rows) * width)
+    for state, row in enumerate(rows):
+        for column, value in row:
+            values[state * width + column] = value
+    return PackedRows(base=array('i', range(0, len(rows) * width, width)), values=values)
+
+
+def pack_comb(rows: List[Row], width: int) -> PackedRows:
+    """Размещает строки первым подходящим сдвигом, начиная с самых заполненных"""
+    base = array('i', [0]) * len(rows)
+    values = array('i')
+    check = array('i')
+    # Бит i установлен, если ячейка i занята; first_free - первая свободная ячейка
+    occupied = 0
+    first_free = 0
+
+    for state in sorted(range(len(rows)), key=lambda s: -len(rows[s])):
+        row = rows[state]
+        if not row:
+            continue
+        first = row[0][0]
+        # Столбцы строки как маска относительно первого из них
+        mask = 0
+        for column, _ in row:
+            mask |= 1 << (column - first)
+
+        # Первый столбец ставим только в свободные ячейки, перескакивая занятые подряд
+        position = max(first_free, first)
+        while True:
+            free = ~occupied >> position
+            position += (free & -free).bit_length() - 1
+            if not (occupied >> position) & mask:
+                break
+            position += 1
+        offset = position - first
+        occupied |= mask << position
+
+        end = offset + row[-1][0] + 1
+        if end > len(check):
+            check.extend([-1] * (end - len(check)))
+            values.extend([EMPTY] * (end - len(values)))
+        for column, value in row:
+            check[offset + column] = state
+            values[offset + column] = value
+        base[state] = offset
+        first_free = (~occupied & (occupied + 1)).bit_length() - 1
+
+    # Хвост, чтобы base[state] + column не выходил за границы массивов
+    tail = max((b + width for b in base), default=0) - len(check)
+    if tail > 0:
+        values.extend([EMPTY] * tail)
+        check.extend([-1] * tail)
+    return PackedRows(base=base, values=values, check=check)
+
+
+@dataclass
+class CompiledTable:
+    """
+    Таблица в виде целочисленных массивов: состояния - номера строк Table,
+    терминалы и нетерминалы - номера столбцов.
+    action: > 0 - сдвиг в состояние (значение - 1), < 0 - свертка по правилу
+    (-значение - 1), 0 - ошибка.
+    goto: номер состояния + 1, ACCEPT или 0.
+    """
+    terminals: Dict[str, int]
+    non_terminals: Dict[str, int]
+    action: PackedRows
+    goto: PackedRows
+    # Сколько состояний снимает свертка по правилу (символ конца не сдвигается)
+    rule_lengths: array
+    # Номер нетерминала левой части правила
+    rule_non_terminals: array
+
+    def expected(self, state: int) -> List[str]:
+        return [name for name, column in self.terminals.items() if self.action.get(state, column) != EMPTY]
+
+    def nbytes(self) -> int:
+        return (self.action.nbytes() + self.goto.nbytes() +
+                self.rule_lengths.itemsize * len(self.rule_lengths) +
+                self.rule_non_terminals.itemsize * len(self.rule_non_terminals))
+
+
+def encode_shift(state: int) -> int:
+    return state + 1
+
+
+def encode_reduce(num_of_rule: int) -> int:
+    return -num_of_rule - 1
+
+
+def compile_table(table: Table, grammar: Grammar, compress: bool = False) -> CompiledTable:
+    """
+    Переводит строки таблицы в целочисленные массивы ACTION/GOTO.
+    compress=True включает сжатие строк сдвигом (row displacement),
+    полезное для больших разреженных таблиц.
+    """
+    grammar = index_grammar(grammar)
+    non_terminals = {name: i for i, name in enumerate(grammar.rules_by_non_terminal)}
+    terminals = {END_SYMBOL: 0}
+    for name in sorted(table.symbols):
+        if name not in non_terminals and name not in terminals:
+            terminals[name] = len(terminals)
+
+    rule_lengths = array('i')
+    rule_non_terminals = array('i')
+    for rule in grammar:
+        length = len(rule.right_part)
+        if rule.right_part[-1] == END_SYMBOL:
+            length -= 1
+        rule_lengths.append(length)
+        rule_non_terminals.append(non_terminals[rule.non_terminal])
+
+    action_rows: List[Row] = []
+    goto_rows: List[Row] = []
+    for table_str in table.strings:
+        action_row: Row = []
+        goto_row: Row = []
+
+        for name, symbols in table_str.next_symbols.items():
+            reduces = {s.num_of_rule for s in symbols if s.name == END_SYMBOL_IN_TABLE}
+            if len(reduces) > 1:
+                raise AmbiguousGrammarError(f"Конфликт свертка/свертка для символа '{name}' в строке таблицы")
+            if reduces:
+                # Свертки по нетерминалам разбору не нужны: предпросмотр всегда терминал
+                if name not in non_terminals:
+                    action_row.append((terminals[name], encode_reduce(reduces.pop())))
+                continue
+
+            if len(symbols) == 1 and symbols[0].name == OK_SYMBOL:
+                goto_row.append((non_terminals[name], ACCEPT))
+                continue
+
+            state = table.find_state(symbols)
+            if state is None:
+                continue
+            if name in non_terminals:
+                goto_row.append((non_terminals[name], encode_shift(state)))
+            else:
+                action_row.append((terminals[name], encode_shift(state)))
+
+        action_rows.append(sorted(action_row))
+        goto_rows.append(sorted(goto_row))
+
+    pack = pack_comb if compress else pack_dense
+    return CompiledTable(
+        terminals=terminals,
+        non_terminals=non_terminals,
+        action=pack(action_rows, len(terminals)),
+        goto=pack(goto_rows, len(non_terminals)),
+        rule_lengths=rule_lengths,
+        rule_non_terminals=rule_non_terminals
+    )
@@ -1,8 +1,10 @@
-from typing import List, Set
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
 from Table import Table, TableStr, END_SYMBOL_IN_TABLE
-from Rule import Rule, is_non_terminal, get_nonterminal_rules, END_SYMBOL
-from Symbol import Symbol
-from GetDirectionSymbols import define_direction_symbols_after_non_terminal
+from Rule import Rule, Grammar, index_grammar, is_non_terminal, get_nonterminal_rules, END_SYMBOL
+from Symbol import Symbol, intern_symbol
+from GetDirectionSymbols import define_follow_symbols
 from ReadGrammar import AmbiguousGrammarError
 
 
@@ -46,8 +48,8 @@ def add_direction_symbols(table_str: TableStr, direction_symbols: List[Symbol],
 
 
 def add_end_direction_symbols(table_str: TableStr, direction_symbols: List[Symbol], num_of_rule: int) -> None:
+    end_symbol = intern_symbol(END_SYMBOL_IN_TABLE, num_of_rule)
     for symbol in direction_symbols:
-        end_symbol = Symbol(name=END_SYMBOL_IN_TABLE, num_of_rule=num_of_rule)
         if symbol.name in table_str.next_symbols:
             # Пропускаем добавление reduce для ELSE
             if symbol.name == 'ELSE':
@@ -65,20 +67,9 @@ def add_end_direction_symbols(table_str: TableStr, direction_symbols: List[Symbo
             table_str.next_symbols[symbol.name] = [end_symbol]
 
 
-def has_state_in_table(table_strs: List[TableStr], symbols_of_state: List[Symbol]) -> bool:
-    for table_str in table_strs:
-        if table_str.symbols == symbols_of_state:
-            return True
-    return False
-
-
 def define_next_symbols(grammar: List[Rule], num_of_rule: int, num_of_right_part: int, table_str: TableStr) -> None:
     symbol_name = grammar[num_of_rule].right_part[num_of_right_part]
-    symbol = Symbol(
-        name=symbol_name,
-        num_of_rule=num_of_rule,
-        num_of_right_part=num_of_right_part
-    )
+    symbol = intern_symbol(symbol_name, num_of_rule, num_of_right_part)
 
     if is_non_terminal(symbol.name, grammar):
         direction_symbols = [symbol]
@@ -94,7 +85,12 @@ def define_next_symbols(grammar: List[Rule], num_of_rule: int, num_of_right_part
     add_direction_symbols(table_str, [symbol], grammar)
 
 
-def add_info_in_string(table_str: TableStr, symbols: List[Symbol], grammar: List[Rule]) -> None:
+def add_info_in_string(
+        table_str: TableStr,
+        symbols: List[Symbol],
+        grammar: List[Rule],
+        follow_symbols: Dict[str, List[Symbol]]
+) -> None:
     for s in symbols:
         if s.num_of_rule is None or s.num_of_right_part is None or s.name == END_SYMBOL:
             continue
@@ -103,37 +99,72 @@ def add_info_in_string(table_str: TableStr, symbols: List[Symbol], grammar: List
         is_end_of_rule = len(grammar[s.num_of_rule].right_part) - 1 == s.num_of_right_part
 
         if is_end_of_rule:
-            direction_symbols = define_direction_symbols_after_non_terminal(
-                set(), grammar[s.num_of_rule].non_terminal, grammar
-            )
+            direction_symbols = follow_symbols[grammar[s.num_of_rule].non_terminal]
             add_end_direction_symbols(table_str, direction_symbols, s.num_of_rule)
             continue
 
         define_next_symbols(grammar, s.num_of_rule, s.num_of_right_part + 1, table_str)
 
 
-def add_new_strings(table: Table, num_of_str: int, grammar: List[Rule]) -> None:
-    table_str = table.strings[num_of_str]
-    new_strs = []
+@dataclass
+class BuildProgress:
+    states: int = 0
+    transitions: int = 0
+    processed: int = 0
+    started: float = field(default_factory=time.perf_counter)
 
-    for next_symbol_name, next_symbols in table_str.next_symbols.items():
-        if (has_state_in_table(table.strings, next_symbols) or
-                has_state_in_table(new_strs, next_symbols)):
-            continue
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def __str__(self) -> str:
+        return (f"states={self.states} processed={self.processed} transitions={self.transitions} "
+                f"time={self.elapsed:.2f}s")
+
+
+ProgressCallback = Callable[[BuildProgress], None]
+
+
+def add_new_strings(
+        table: Table,
+        num_of_str: int,
+        grammar: List[Rule],
+        on_progress: Optional[ProgressCallback] = None,
+        report_every: int = 1000,
+        follow_symbols: Optional[Dict[str, List[Symbol]]] = None
+) -> BuildProgress:
+    if follow_symbols is None:
+        follow_symbols = define_follow_symbols(grammar)
+
+    # Строки таблицы сами служат очередью: обрабатываем их по порядку, пока не кончатся
+    progress = BuildProgress(states=len(table.strings))
+
+    while num_of_str < len(table.strings):
+        table_str = table.strings[num_of_str]
+
+        for next_symbol_name, next_symbols in table_str.next_symbols.items():
+            progress.transitions += 1
+            if table.find_state(next_symbols) is not None:
+                continue
 
-        new_str = TableStr(symbols=[], next_symbols={})
-        add_info_in_string(new_str, next_symbols, grammar)
+            new_str = TableStr(symbols=[], next_symbols={})
+            add_info_in_string(new_str, next_symbols, grammar, follow_symbols)
 
-        if new_str.symbols:
-            new_strs.append(new_str)
+            if new_str.symbols:
+                table.add_string(new_str)
 
-    table.strings.extend(new_strs)
+        num_of_str += 1
+        progress.processed = num_of_str
+        progress.states = len(table.strings)
+        if on_progress is not None and num_of_str % report_every == 0:
+            on_progress(progress)
 
-    if num_of_str + 1 < len(table.strings):
-        add_new_strings(table, num_of_str + 1, grammar)
+    if on_progress is not None:
+        on_progress(progress)
+    return progress
 
 
-def create_table(grammar: List[Rule]) -> Table:
+def create_table(grammar: Grammar, on_progress: Optional[ProgressCallback] = None) -> Table:
     # Автоматически добавляем правила для stmt_without_if, если их нет
 #     has_stmt_without_if = any(r.non_terminal == 'stmt_without_if' for r in grammar)
 #     if not has_stmt_without_if:
@@ -147,6 +178,7 @@ def create_table(grammar: List[Rule]) -> Table:
 #         ]
 #         grammar.extend(new_rules)
 
+    grammar = index_grammar(grammar)
     table = Table(symbols=set(), strings=[])
     table.symbols = get_all_symbols(grammar)
 
@@ -168,7 +200,7 @@ def create_table(grammar: List[Rule]) -> Table:
         if rule.non_terminal == symbol_of_first_str.name:
             add_direction_symbols(first_str, rule.direction_symbols, grammar)
 
-    table.strings.append(first_str)
-    add_new_strings(table, 0, grammar)
+    table.add_string(first_str)
+    add_new_strings(table, 0, grammar, on_progress)
 
     return table
\ No newline at end of file
@@ -1,22 +1,24 @@
-from typing import List, Set
+import heapq
+from typing import Dict, List, Set
 from Symbol import Symbol
-from Rule import Rule, is_non_terminal, EMPTY_SYMBOL
+from Rule import Rule, Grammar, index_grammar, is_non_terminal, get_nonterminal_rules, EMPTY_SYMBOL
 
 
 def add_new_symbols(current: List[Symbol], new: List[Symbol]) -> bool:
     has_change = False
+    existing = set(current)
     for symbol in new:
-        if symbol not in current:
+        if symbol not in existing:
+            existing.add(symbol)
             current.append(symbol)
             has_change = True
     return has_change
 
 
-def define_non_terminal_direction_symbols(non_terminal: str, rules: List[Rule]) -> List[Symbol]:
+def define_non_terminal_direction_symbols(non_terminal: str, rules: Grammar) -> List[Symbol]:
     direction_symbols = []
-    for rule in rules:
-        if rule.non_terminal == non_terminal:
-            direction_symbols.extend(rule.direction_symbols)
+    for rule in get_nonterminal_rules(rules, non_terminal):
+        direction_symbols.extend(rule.direction_symbols)
     return direction_symbols
 
 
@@ -79,27 +81,122 @@ def define_direction_symbols_after_non_terminal(
     return direction_symbols
 
 
-def define_direction_symbols(rules: List[Rule]) -> None:
-    has_changes = False
-    for i, rule in enumerate(rules):
+def define_direction_symbols(rules: Grammar) -> None:
+    """
+    Направляющие символы правил, итерацией до неподвижной точки.
+    Проходы идут по правилам в том же порядке, что и раньше, но на каждом
+    проходе пересчитываются только "грязные" правила - те, у чьих источников
+    (правил первого символа) появились новые символы. Списки направляющих
+    символов только растут, поэтому из источника берётся лишь непрочитанный
+    хвост, а повторы отсекаются по множеству.
+    """
+    rules = index_grammar(rules)
+    for rule in rules:
         if not rule.right_part:
             raise ValueError("Right part is empty")
 
-        if len(rule.right_part) == 1 and rule.right_part[0] == EMPTY_SYMBOL:
-            symbols = define_direction_symbols_after_non_terminal(set(), rule.non_terminal, rules)
-            has_changes = add_new_symbols(rule.direction_symbols, symbols) or has_changes
-            continue
-
-        if is_non_terminal(rule.right_part[0], rules):
-            symbols = define_non_terminal_direction_symbols(rule.right_part[0], rules)
-            has_changes = add_new_symbols(rule.direction_symbols, symbols) or has_changes
-
-        symbol = Symbol(
-            name=rule.right_part[0],
-            num_of_rule=i,
-            num_of_right_part=0
-        )
-        has_changes = add_new_symbols(rule.direction_symbols, [symbol]) or has_changes
+    empty_rules = [i for i, rule in enumerate(rules) if rule.right_part == [EMPTY_SYMBOL]]
+    seen = [set(rule.direction_symbols) for rule in rules]
+    # consumed[i][j] - сколько символов правила j уже перенесено в правило i
+    consumed: List[Dict[int, int]] = [{} for _ in rules]
+    # dependents[A] - правила, которые начинаются с нетерминала A
+    dependents: Dict[str, List[int]] = {}
+    for i, rule in enumerate(rules):
+        if rule.right_part[0] in rules.non_terminals:
+            dependents.setdefault(rule.right_part[0], []).append(i)
+
+    def add(i: int, symbols: List[Symbol]) -> bool:
+        has_change = False
+        for symbol in symbols:
+            if symbol not in seen[i]:
+                seen[i].add(symbol)
+                rules[i].direction_symbols.append(symbol)
+                has_change = True
+        return has_change
+
+    dirty = list(range(len(rules)))
+    while dirty:
+        queued = set(dirty)
+        heapq.heapify(dirty)
+        next_dirty = set()
+        has_changes = False
+
+        while dirty:
+            i = heapq.heappop(dirty)
+            rule = rules[i]
+            if rule.right_part == [EMPTY_SYMBOL]:
+                symbols = define_direction_symbols_after_non_terminal(set(), rule.non_terminal, rules)
+                if not add(i, symbols):
+                    continue
+            else:
+                first = rule.right_part[0]
+                changed = False
+                for j in rules.rules_by_non_terminal.get(first, []):
+                    source = rules[j].direction_symbols
+                    tail = source[consumed[i].get(j, 0):]
+                    consumed[i][j] = len(source)
+                    changed = add(i, tail) or changed
+                changed = add(i, [Symbol(name=first, num_of_rule=i, num_of_right_part=0)]) or changed
+                if not changed:
+                    continue
+
+            has_changes = True
+            for dependent in dependents.get(rule.non_terminal, []):
+                if dependent > i and dependent not in queued:
+                    queued.add(dependent)
+                    heapq.heappush(dirty, dependent)
+                elif dependent <= i:
+                    next_dirty.add(dependent)
+
+        if not has_changes:
+            break
+        # Правила с пустой правой частью зависят от всей грамматики
+        dirty = list(next_dirty.union(empty_rules))
+
+
+def define_follow_symbols(rules: Grammar) -> Dict[str, List[Symbol]]:
+    """
+    Символы, которые могут следовать за каждым нетерминалом (FOLLOW).
+    Считаются один раз для всей грамматики итерацией до неподвижной точки:
+    сначала собираем непосредственные вклады и зависимости, затем переносим
+    символы по зависимостям, пока множества не перестанут расти.
+    В каждом списке символ с данным именем встречается один раз.
+    """
+    rules = index_grammar(rules)
+    non_terminals = rules.non_terminals
+    follow: Dict[str, Dict[str, Symbol]] = {non_terminal: {} for non_terminal in rules.rules_by_non_terminal}
+    # inherits[A] - нетерминалы, чьё FOLLOW входит в FOLLOW(A)
+    inherits: Dict[str, List[str]] = {non_terminal: [] for non_terminal in follow}
+
+    def add(target: Dict[str, Symbol], symbols: List[Symbol]) -> bool:
+        has_change = False
+        for symbol in symbols:
+            if symbol.name not in target:
+                target[symbol.name] = symbol
+                has_change = True
+        return has_change
 
-    if has_changes:
-        define_direction_symbols(rules)
\ No newline at end of file
+    for i, rule in enumerate(rules):
+        right_part = rule.right_part
+        for index, symbol_name in enumerate(right_part):
+            if symbol_name not in non_terminals:
+                continue
+            next_index = index + 1
+            if next_index >= len(right_part):
+                if rule.non_terminal not in inherits[symbol_name]:
+                    inherits[symbol_name].append(rule.non_terminal)
+                continue
+            next_symbol = right_part[next_index]
+            if next_symbol in non_terminals:
+                add(follow[symbol_name], define_non_terminal_direction_symbols(next_symbol, rules))
+            add(follow[symbol_name], [Symbol(name=next_symbol, num_of_rule=i, num_of_right_part=next_index)])
+
+    has_changes = True
+    while has_changes:
+        has_changes = False
+        for non_terminal, sources in inherits.items():
+            for source in sources:
+                if source != non_terminal:
+                    has_changes = add(follow[non_terminal], list(follow[source].values())) or has_changes
+
+    return {non_terminal: list(symbols.values()) for non_terminal, symbols in follow.items()}
@@ -0,0 +1,167 @@
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional, Tuple
+from CompileTable import CompiledTable, ACCEPT, EMPTY
+from Rule import END_SYMBOL
+from lexer import Lexer
+from lexer_token import LexerToken
+
+# Токены, которые не доходят до синтаксического анализатора
+SKIPPED_TOKENS = frozenset(('SPACE', 'LINE_COMMENT', 'BLOCK_COMMENT'))
+# Строка и столбец символа по его смещению от начала файла (Lexer.position_of)
+PositionOf = Callable[[int], Tuple[int, int]]
+
+
+@dataclass
+class ParseResult:
+    accepted: bool
+    # Количество значимых токенов, прочитанных до конца разбора или до ошибки
+    tokens: int
+    # None, если позиции токенов не отслеживались (см. resolve_position)
+    position: Optional[Tuple[int, int]] = None
+    # Смещение места ошибки от начала файла
+    offset: int = -1
+    token: Optional[str] = None
+    value: Optional[str] = None
+    expected: List[str] = field(default_factory=list)
+    position_of: Optional[PositionOf] = field(default=None, repr=False, compare=False)
+
+    def __bool__(self) -> bool:
+        return self.accepted
+
+    def resolve_position(self) -> Optional[Tuple[int, int]]:
+        if self.position is None and self.position_of is not None and self.offset >= 0:
+            self.position = self.position_of(self.offset)
+        return self.position
+
+    def __str__(self) -> str:
+        if self.accepted:
+            return f"Разбор успешен, токенов: {self.tokens}"
+        position = self.resolve_position()
+        if position is not None:
+            line, column = position
+            where = f"в строке {line}, столбце {column}"
+        else:
+            # Позиции токенов не отслеживались, и вычислить их не по чему
+            where = f"на смещении {self.offset}"
+        found = "конец файла" if self.value is None else f"токен '{self.value}' ({self.token})"
+        return f"Ошибка разбора {where}: встречен {found}, ожидалось: {', '.join(self.expected)}"
+
+
+def position_after(token: Optional[LexerToken]) -> Optional[Tuple[int, int]]:
+    if token is None:
+        return 1, 1
+    if token.pos is None:
+        return None
+    line, column = token.pos
+    lines = token.value.split('\n')
+    if len(lines) == 1:
+        return line, column + len(token.value)
+    return line + len(lines) - 1, len(lines[-1]) + 1
+
+
+def parse_tokens(tokens: Iterable[LexerToken], compiled: CompiledTable,
+                 position_of: Optional[PositionOf] = None) -> ParseResult:
+    """
+    Разбор потока токенов сдвигами и свертками по скомпилированной таблице.
+    Конец потока подаётся анализатору как символ конца '#'.
+    position_of нужен для токенов без позиций (Lexer(track_positions=False)):
+    через него результат найдёт строку и столбец ошибки.
+    """
+    terminals = compiled.terminals
+    action_base, action_values, action_check = compiled.action.base, compiled.action.values, compiled.action.check
+    goto_base, goto_values, goto_check = compiled.goto.base, compiled.goto.values, compiled.goto.check
+    rule_lengths = compiled.rule_lengths
+    rule_non_terminals = compiled.rule_non_terminals
+
+    states = [0]
+    count = 0
+    # Последний прочитанный токен: позиция конца входа нужна только при ошибке
+    last = None
+    tokens = iter(tokens)
+
+    while True:
+        token = next(tokens, None)
+        if token is None:
+            name = END_SYMBOL
+            position = position_after(last)
+            offset = 0 if last is None else last.offset + len(last.value)
+        elif token.type in SKIPPED_TOKENS:
+            last = token
+            continue
+        else:
+            name = token.type
+            position = token.pos
+            offset = token.offset
+            last = token
+            count += 1
+
+        terminal = terminals.get(name, -1)
+        while True:
+            state = states[-1]
+            if terminal < 0:
+                code = EMPTY
+            else:
+                index = action_base[state] + terminal
+                code = action_values[index] if action_check is None or action_check[index] == state else EMPTY
+            if code > 0:
+                states.append(code - 1)
+                break
+
+            if code == EMPTY:
+                return ParseResult(
+                    accepted=False,
+                    tokens=count,
+                    position=position,
+                    offset=offset,
+                    token=name,
+                    value=None if token is None else token.value,
+                    expected=compiled.expected(state),
+                    position_of=position_of
+                )
+
+            num_of_rule = -code - 1
+            length = rule_lengths[num_of_rule]
+            if length:
+                del states[-length:]
+            top = states[-1]
+            index = goto_base[top] + rule_non_terminals[num_of_rule]
+            target = goto_values[index] if goto_check is None or goto_check[index] == top else EMPTY
+            if target == ACCEPT:
+                return finish(tokens, count, position_of)
+            if target == EMPTY:
+                # Перехода нет только в некорректной таблице
+                return ParseResult(accepted=False, tokens=count, position=position, offset=offset, token=name,
+                                   position_of=position_of)
+            states.append(target - 1)
+
+        if token is None:
+            # Символ конца сдвигается только в некорректной таблице
+            return ParseResult(accepted=False, tokens=count, position=position, offset=offset, token=name,
+                               position_of=position_of)
+
+
+def finish(tokens: Iterable[LexerToken], count: int,
+           position_of: Optional[PositionOf]) -> ParseResult:
+    # После принятия во входе могут остаться только пробелы и комментарии
+    for token in tokens:
+        if token.type not in SKIPPED_TOKENS:
+            return ParseResult(
+                accepted=False,
+                tokens=count + 1,
+                position=token.pos,
+                offset=token.offset,
+                token=token.type,
+                value=token.value,
+                expected=[END_SYMBOL],
+                position_of=position_of
+            )
+    return ParseResult(accepted=True, tokens=count)
+
+
+def parse_file(input_file: str, compiled: CompiledTable) -> ParseResult:
+    # Строка и столбец вычисляются только для места ошибки, а не для каждого токена
+    lexer = Lexer(input_file, track_positions=False)
+    try:
+        return parse_tokens(iter(lexer.next_token, None), compiled, lexer.position_of)
+    finally:
+        lexer.close()
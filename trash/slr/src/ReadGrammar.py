@@ -1,5 +1,5 @@
 from typing import List, TextIO
-from Rule import Rule, get_rules_with_nonterminal, EMPTY_SYMBOL
+from Rule import Rule, GrammarIndex, get_rules_with_nonterminal, EMPTY_SYMBOL
 from GetDirectionSymbols import define_direction_symbols
 
 
@@ -182,7 +182,7 @@ def find_alternative_rules_without_empty_symbol(rules: List[Rule]) -> List[Rule]
     return new_rules
 
 
-def read_grammar(input_file: TextIO, token_types_name: List[str]) -> List[Rule]:
+def read_grammar(input_file: TextIO, token_types_name: List[str]) -> GrammarIndex:
     rules = []
     for line in input_file:
         if "->" not in line:
@@ -193,6 +193,8 @@ def read_grammar(input_file: TextIO, token_types_name: List[str]) -> List[Rule]:
 
     rules = find_alternative_rules_without_empty_symbol(rules)
     rules = remove_rules_with_empty_symbol(rules)
+    # Дальше набор правил не меняется, поэтому индексируем его один раз
+    rules = GrammarIndex(rules)
     define_direction_symbols(rules)
 
     if not is_reachable(rules):
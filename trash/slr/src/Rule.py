@@ -1,5 +1,5 @@
-from typing import List, Optional
-from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+from dataclasses import dataclass, field
 from Symbol import Symbol
 
 EMPTY_SYMBOL = "ε"
@@ -23,20 +23,73 @@ class Rule:
                 self.direction_symbols == other.direction_symbols)
 
 
-def is_non_terminal(s: str, rules: List[Rule]) -> bool:
+@dataclass
+class GrammarIndex:
+    """
+    Индекс готовой грамматики: строится один раз после чтения и отвечает
+    на вопросы о нетерминалах без просмотра всего списка правил.
+    Ведёт себя как неизменяемый список правил.
+    """
+    rules: List[Rule]
+    non_terminals: Set[str] = field(init=False)
+    # Номера правил по левой части
+    rules_by_non_terminal: Dict[str, List[int]] = field(init=False)
+    # Вхождения символа в правые части: (номер правила, позиция)
+    occurrences: Dict[str, List[Tuple[int, int]]] = field(init=False)
+
+    def __post_init__(self):
+        self.rules = list(self.rules)
+        self.rules_by_non_terminal = {}
+        self.occurrences = {}
+        for i, rule in enumerate(self.rules):
+            self.rules_by_non_terminal.setdefault(rule.non_terminal, []).append(i)
+            for position, symbol in enumerate(rule.right_part):
+                self.occurrences.setdefault(symbol, []).append((i, position))
+        self.non_terminals = set(self.rules_by_non_terminal)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __iter__(self) -> Iterator[Rule]:
+        return iter(self.rules)
+
+    def __getitem__(self, index):
+        return self.rules[index]
+
+
+Grammar = Union[List[Rule], GrammarIndex]
+
+
+def index_grammar(rules: Grammar) -> GrammarIndex:
+    if isinstance(rules, GrammarIndex):
+        return rules
+    return GrammarIndex(rules)
+
+
+def is_non_terminal(s: str, rules: Grammar) -> bool:
+    if isinstance(rules, GrammarIndex):
+        return s in rules.non_terminals
     return any(rule.non_terminal == s for rule in rules)
 
 
-def get_index_of_nonterminal(rules: List[Rule], non_terminal: str) -> Optional[int]:
+def get_index_of_nonterminal(rules: Grammar, non_terminal: str) -> Optional[int]:
+    if isinstance(rules, GrammarIndex):
+        numbers = rules.rules_by_non_terminal.get(non_terminal)
+        return numbers[0] if numbers else None
     for i, rule in enumerate(rules):
         if rule.non_terminal == non_terminal:
             return i
     return None
 
 
-def get_rules_with_nonterminal(rules: List[Rule], non_terminal: str) -> List[Rule]:
+def get_rules_with_nonterminal(rules: Grammar, non_terminal: str) -> List[Rule]:
+    if isinstance(rules, GrammarIndex):
+        numbers = dict.fromkeys(i for i, _ in rules.occurrences.get(non_terminal, []))
+        return [rules.rules[i] for i in numbers]
     return [rule for rule in rules if non_terminal in rule.right_part]
 
 
-def get_nonterminal_rules(rules: List[Rule], non_terminal: str) -> List[Rule]:
+def get_nonterminal_rules(rules: Grammar, non_terminal: str) -> List[Rule]:
+    if isinstance(rules, GrammarIndex):
+        return [rules.rules[i] for i in rules.rules_by_non_terminal.get(non_terminal, [])]
     return [rule for rule in rules if rule.non_terminal == non_terminal]
\ No newline at end of file
@@ -1,23 +1,59 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Symbol:
     name: str
     num_of_rule: Optional[int] = None
     num_of_right_part: Optional[int] = None
+    # Строковое представление и хеш считаются один раз при создании
+    _text: str = field(init=False, repr=False, compare=False)
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.num_of_rule is not None and self.num_of_right_part is not None:
+            text = f"{self.name}{self.num_of_rule + 1}{self.num_of_right_part + 1}"
+        elif self.num_of_rule is not None:
+            text = f"{self.name}{self.num_of_rule + 1}"
+        else:
+            text = self.name
+        object.__setattr__(self, "_text", text)
+        object.__setattr__(self, "_hash", hash((self.name, self.num_of_rule, self.num_of_right_part)))
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, Symbol):
             return NotImplemented
         return (self.name == other.name and
                 self.num_of_rule == other.num_of_rule and
                 self.num_of_right_part == other.num_of_right_part)
 
+    def __hash__(self) -> int:
+        return self._hash
+
     def __str__(self) -> str:
-        if self.num_of_rule is not None and self.num_of_right_part is not None:
-            return f"{self.name}{self.num_of_rule + 1}{self.num_of_right_part + 1}"
-        if self.num_of_rule is not None:
-            return f"{self.name}{self.num_of_rule + 1}"
-        return self.name
+        return self._text
+
+    def __reduce__(self):
+        # Хеш строки зависит от PYTHONHASHSEED, поэтому при pickle/copy символ
+        # создаётся заново, а не восстанавливается сохранённый _hash
+        return Symbol, (self.name, self.num_of_rule, self.num_of_right_part)
+
+
+_interned: Dict[Tuple[str, Optional[int], Optional[int]], Symbol] = {}
+
+
+def intern_symbol(
+        name: str,
+        num_of_rule: Optional[int] = None,
+        num_of_right_part: Optional[int] = None
+) -> Symbol:
+    """Возвращает общий экземпляр символа, чтобы одинаковые ячейки таблицы не создавали копий"""
+    key = (name, num_of_rule, num_of_right_part)
+    symbol = _interned.get(key)
+    if symbol is None:
+        symbol = Symbol(name, num_of_rule, num_of_right_part)
+        _interned[key] = symbol
+    return symbol
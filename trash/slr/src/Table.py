@@ -1,5 +1,5 @@
-from typing import List, Dict, Set
-from dataclasses import dataclass
+from typing import List, Dict, Set, Tuple, Optional
+from dataclasses import dataclass, field
 from Symbol import Symbol
 
 END_SYMBOL_IN_TABLE = "R"
@@ -11,7 +11,24 @@ class TableStr:
     next_symbols: Dict[str, List[Symbol]]
 
 
+StateKey = Tuple[Symbol, ...]
+
+
+def state_key(symbols: List[Symbol]) -> StateKey:
+    return tuple(symbols)
+
+
 @dataclass
 class Table:
     symbols: Set[str]
     strings: List[TableStr]
+    state_index: Dict[StateKey, int] = field(default_factory=dict)
+
+    def add_string(self, table_str: TableStr) -> int:
+        num_of_str = len(self.strings)
+        self.strings.append(table_str)
+        self.state_index.setdefault(state_key(table_str.symbols), num_of_str)
+        return num_of_str
+
+    def find_state(self, symbols: List[Symbol]) -> Optional[int]:
+        return self.state_index.get(state_key(symbols))
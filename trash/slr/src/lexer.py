@@ -1,80 +1,187 @@
+from bisect import bisect_right
 from lexer_token import LexerToken
 from token_type import TOKEN_TYPES
-from simulator import Simulator
+from simulator import Simulator, CombinedSimulator, DEAD
+from simulator.cache import Automata, automata_fingerprint, load_cached, store_cached
 
-SIMULATORS_MAP = {token.name: Simulator(token.regex) for token in TOKEN_TYPES}
+# Токены ошибок (BAD_...) поглощают весь остаток буфера, поэтому при поиске
+# самого длинного совпадения они выиграли бы всегда. Их пробуем по отдельности
+# и только если обычные токены не подошли.
+FALLBACK_TOKEN_TYPES = [token for token in TOKEN_TYPES if token.name.startswith('BAD')]
+LEXEME_TOKEN_TYPES = [token for token in TOKEN_TYPES if not token.name.startswith('BAD')]
+WRAPPED_TOKENS = frozenset((
+    'ARRAY', 'BEGIN', 'ELSE', 'END', 'IF', 'OF', 'OR', 'PROGRAM', 'PROCEDURE', 'THEN',
+    'TYPE', 'VAR', 'INTEGER', 'IDENTIFIER'))
+
+DIVIDERS = ' \n\t\r"()+-;:,.[]{}*/\'\xa0<>='
+SPACES = ' \n\t\r'
+CHUNK_SIZE = 64 * 1024
+# Сколько непрочитанного текста держим в буфере перед разбором очередного токена
+MIN_LOOKAHEAD = 1024
+
+_automata: Automata | None = None
+
+
+def build_line_starts(input_file: str) -> list[int]:
+    """Смещения (в символах) начал всех строк файла"""
+    line_starts = [0]
+    consumed = 0
+    with open(input_file, 'r', encoding='utf-8') as file:
+        while chunk := file.read(CHUNK_SIZE):
+            index = chunk.find('\n')
+            while index != -1:
+                line_starts.append(consumed + index + 1)
+                index = chunk.find('\n', index + 1)
+            consumed += len(chunk)
+    return line_starts
+
+
+def get_automata() -> Automata:
+    # Автоматы строятся (или читаются из кэша на диске) при создании первого Lexer, а не при импорте
+    global _automata
+    if _automata is None:
+        fingerprint = automata_fingerprint(
+            [(token.name, token.regex) for token in LEXEME_TOKEN_TYPES],
+            [(token.name, token.regex) for token in FALLBACK_TOKEN_TYPES]
+        )
+        _automata = load_cached(fingerprint)
+        if _automata is None:
+            _automata = (
+                CombinedSimulator([token.regex for token in LEXEME_TOKEN_TYPES]).compiled,
+                {token.name: Simulator(token.regex).compiled for token in FALLBACK_TOKEN_TYPES}
+            )
+            store_cached(fingerprint, _automata)
+    return _automata
 
 
 class Lexer:
-    def __init__(self, input_file: str):
+    def __init__(self, input_file: str, track_positions: bool = True):
+        self.input_file = input_file
         self.file = open(input_file, 'r', encoding='utf-8')
+        # Разобранная часть буфера не вырезается после каждого токена:
+        # offset указывает на начало непрочитанного текста, а сдвиг буфера
+        # происходит только при чтении следующего блока файла
         self.buffer = ''
+        self.offset = 0
+        # Смещение начала буфера от начала файла
+        self.buffer_start = 0
+        self.last_space = -1
+        # Без отслеживания позиций у токенов есть только смещение; строку и
+        # столбец можно получить через position_of, когда они понадобятся
+        self.track_positions = track_positions
+        self.line_starts: list[int] | None = None
         self.line = 1
         self.column = 1
         self.eof = False
         self.prev = ''
+        self.automata, self.fallback_automata = get_automata()
 
     def _is_not_wrapped(self, result: str):
-        return (self.prev not in ' \n\t\r"()+-;:,.[]{}*/\'\xa0<>='
-                or (len(self.buffer) > len(result)
-                    and self.buffer[len(result)] not in ' \n\t\r"()+-;:,.[]{}*/\'\xa0<>='))
+        end = self.offset + len(result)
+        return (self.prev not in DIVIDERS
+                or (len(self.buffer) > end
+                    and self.buffer[end] not in DIVIDERS))
+
+    def _needs_more(self) -> bool:
+        buffer, offset = self.buffer, self.offset
+        if len(buffer) - offset < MIN_LOOKAHEAD:
+            return True
+        # Токен в начале непрочитанного текста должен целиком лежать в буфере
+        first = buffer[offset]
+        if first == '{':
+            return buffer.find('}', offset) == -1
+        if first == '/' and buffer.startswith('//', offset):
+            return buffer.find('\n', offset) == -1
+        if first == "'":
+            return buffer.find("'", offset + 1) == -1
+        if self.last_space < offset:
+            # Последний пробельный символ буфера годится для всех токенов до него
+            self.last_space = max(buffer.rfind(space) for space in SPACES)
+        return self.last_space < offset
 
     def _fill_buffer(self) -> None:
-        if not self.eof:
-            chunk = self.file.read(1024)
+        while not self.eof and self._needs_more():
+            chunk = self.file.read(CHUNK_SIZE)
             if chunk:
-                self.buffer += chunk
-                if not any(map(lambda space: space in self.buffer, ' \n\t\r')):
-                    self._fill_buffer()
-                if '//' in self.buffer and '\n' not in self.buffer:
-                    self._fill_buffer()
-                if '{' in self.buffer and '}' not in self.buffer:
-                    self._fill_buffer()
+                self.buffer = self.buffer[self.offset:] + chunk
+                self.buffer_start += self.offset
+                self.offset = 0
+                self.last_space = -1
             else:
                 self.eof = True
 
     def next_token(self) -> LexerToken | None:
-        while not self.eof or self.buffer:
+        while not self.eof or self.offset < len(self.buffer):
             self._fill_buffer()
-            if not self.buffer:
+            if self.offset >= len(self.buffer):
                 return None
 
-            for token_type in TOKEN_TYPES:
-                token_name = token_type.name
-                simulator = SIMULATORS_MAP.get(token_type.name)
-                result = simulator.run(self.buffer)
-                if result:
-                    if token_name == 'LINE_COMMENT':
-                        result = result[:-1]
-                    if token_name in (
-                            'ARRAY', 'BEGIN', 'ELSE', 'END', 'IF', 'OF', 'OR', 'PROGRAM', 'PROCEDURE', 'THEN',
-                            'TYPE', 'VAR', 'INTEGER', 'IDENTIFIER'):
-                        if self._is_not_wrapped(result):
-                            continue
-                    if token_name == 'INTEGER':
-                        if len(result) > 16:
-                            token_name = 'BAD'
-                    if token_name == 'IDENTIFIER':
-                        if len(result) > 256:
-                            token_name = 'BAD'
-                    if 'BAD_' in token_name:
+            token_name, result = self._match()
+            if result:
+                if token_name == 'LINE_COMMENT':
+                    result = result[:-1]
+                if token_name == 'INTEGER':
+                    if len(result) > 16:
+                        token_name = 'BAD'
+                if token_name == 'IDENTIFIER':
+                    if len(result) > 256:
                         token_name = 'BAD'
-                    token = LexerToken(token_name, result, (self.line, self.column))
-                    self._update_position(result)
-                    return token
+                if 'BAD_' in token_name:
+                    token_name = 'BAD'
+                position = (self.line, self.column) if self.track_positions else None
+                token = LexerToken(token_name, result, position, self.buffer_start + self.offset)
+                self._update_position(result)
+                return token
 
             return None
 
         return None
 
+    def _match(self) -> tuple[str, str]:
+        # Один проход по общему ДКА: самое длинное совпадение, при равной длине -
+        # токен, который раньше в TOKEN_TYPES.
+        #
+        # Совместимость: раньше токены пробовались по очереди и побеждал первый
+        # подошедший, поэтому поток токенов изменился на входах, где ключевое
+        # слово - префикс более длинного токена:
+        #   total   - было TO 'to' + BAD 'tal',     стало IDENTIFIER 'total'
+        #   WRITELN - было WRITE + BAD 'LN',        стало WRITELN
+        #   div2    - было DIV + BAD '2',           стало IDENTIFIER 'div2'
+        #   TOdo    - было TO + DO,                 стало IDENTIFIER 'TOdo'
+        #   .5E-3   - было DOT + FLOAT '5E-3',      стало FLOAT '.5E-3'
+        # Эти случаи закреплены в tests/test_lexer.py
+        offset = self.offset
+        priority, end = self.automata.match(self.buffer, offset)
+        if priority != DEAD and end > offset:
+            token_name = LEXEME_TOKEN_TYPES[priority].name
+            result = self.buffer[offset:end]
+            if token_name not in WRAPPED_TOKENS or not self._is_not_wrapped(result):
+                return token_name, result
+
+        for token_type in FALLBACK_TOKEN_TYPES:
+            tag, end = self.fallback_automata[token_type.name].match(self.buffer, offset)
+            if tag != DEAD and end > offset:
+                return token_type.name, self.buffer[offset:end]
+        return '', ''
+
     def _update_position(self, result: str) -> None:
         self.prev = result[-1]
-        self.buffer = self.buffer[len(result):]
-        self.column += len(result)
-        if '\n' in result:
-            lines = result.split('\n')
-            self.line += len(lines) - 1
-            self.column = len(lines[-1]) + 1
+        self.offset += len(result)
+        if not self.track_positions:
+            return
+        newlines = result.count('\n')
+        if newlines:
+            self.line += newlines
+            self.column = len(result) - result.rfind('\n')
+        else:
+            self.column += len(result)
+
+    def position_of(self, offset: int) -> tuple[int, int]:
+        """Строка и столбец символа по его смещению от начала файла"""
+        if self.line_starts is None:
+            self.line_starts = build_line_starts(self.input_file)
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
 
     def close(self) -> None:
         if self.file is not None:
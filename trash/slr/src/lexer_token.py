@@ -1,8 +1,9 @@
 class LexerToken:
-    def __init__(self, lexer_type: str, value: str, pos: (int, int)):
+    def __init__(self, lexer_type: str, value: str, pos: (int, int), offset: int = -1):
         self.type = lexer_type
         self.value = value
         self.pos = pos
+        self.offset = offset
 
     def __str__(self):
         return f'{self.type} {self.pos} "{self.value}"'
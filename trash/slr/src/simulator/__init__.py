@@ -1 +1,2 @@
 from .simulator import Simulator
+from .combined import CombinedSimulator, DEAD
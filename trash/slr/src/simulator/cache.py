@@ -0,0 +1,48 @@
+import importlib.util
+import os
+
+from .compiled import CompiledMachine
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load_disk_cache():
+    # Общий модуль подключается по пути к файлу, чтобы импорт не менял sys.path
+    spec = importlib.util.spec_from_file_location(
+        "disk_cache", os.path.join(SOURCE_DIR, "..", "..", "..", "common", "disk_cache.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_disk_cache = _load_disk_cache()
+DiskCache = _disk_cache.DiskCache
+code_version = _disk_cache.code_version
+
+CACHE_VERSION = 2
+CACHE_DIR = os.environ.get("SLR_LEXER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "slr-lexer"))
+# SLR_LEXER_NO_CACHE=1 отключает кэш на диске
+CACHE_ENABLED = os.environ.get("SLR_LEXER_NO_CACHE", "") in ("", "0")
+# Автоматы зависят не только от регулярных выражений, но и от кода их построения
+CODE_VERSION = code_version(os.path.join(SOURCE_DIR, name) for name in (
+    "regex_to_nfa.py", "nfa_to_dfa.py", "minimize.py", "simulator.py", "combined.py", "compiled.py"))
+
+Automata = tuple[CompiledMachine, dict[str, CompiledMachine]]
+
+
+def _cache(cache_dir: str) -> DiskCache:
+    return DiskCache(cache_dir, CACHE_VERSION, CODE_VERSION, CACHE_ENABLED)
+
+
+def automata_fingerprint(lexemes: list[tuple[str, str]], fallbacks: list[tuple[str, str]]) -> str:
+    parts = [f"{kind} {name} {regex!r}"
+             for kind, definitions in (("lexeme", lexemes), ("fallback", fallbacks)) for name, regex in definitions]
+    return _cache(CACHE_DIR).fingerprint(*parts)
+
+
+def load_cached(fingerprint: str, cache_dir: str = CACHE_DIR) -> Automata | None:
+    return _cache(cache_dir).load(fingerprint)
+
+
+def store_cached(fingerprint: str, automata: Automata, cache_dir: str = CACHE_DIR) -> None:
+    _cache(cache_dir).store(fingerprint, automata)
@@ -0,0 +1,88 @@
+from .regex_to_nfa import State, build_nfa, parse_regex
+from .compiled import DEAD, compile_machine
+
+# Литерал ε в регулярных выражениях означает пустой переход (см. adapt_nfa)
+EPSILON = 'ε'
+ANY = 'ANY'
+
+
+def epsilon_closure(states: set[State]) -> frozenset[State]:
+    closure = set(states)
+    stack = list(states)
+    while stack:
+        state = stack.pop()
+        for target in state.epsilon_transitions + state.transitions.get(EPSILON, []):
+            if target not in closure:
+                closure.add(target)
+                stack.append(target)
+    return frozenset(closure)
+
+
+class CombinedMachine:
+    """
+    Один ДКА для нескольких токенов. Допускающее состояние помечено номером
+    токена с наивысшим приоритетом (меньший номер - раньше в списке).
+    Как и в Simulator, сначала ищется переход по самому символу,
+    и только если его нет - переход по ANY.
+    """
+
+    def __init__(self, transitions: list[dict[str, int]], any_transitions: list[int], accepts: list[int]):
+        self.transitions = transitions
+        self.any_transitions = any_transitions
+        self.accepts = accepts
+
+    def __len__(self) -> int:
+        return len(self.transitions)
+
+
+def build_combined_machine(regexes: list[str]) -> CombinedMachine:
+    start = State()
+    accept_priority: dict[State, int] = {}
+    for priority, regex in enumerate(regexes):
+        nfa = build_nfa(parse_regex(regex))
+        start.add_epsilon_transition(nfa.start_state)
+        accept_priority[nfa.accept_state] = priority
+
+    initial = epsilon_closure({start})
+    index = {initial: 0}
+    queue = [initial]
+    transitions: list[dict[str, int]] = []
+    any_transitions: list[int] = []
+    accepts: list[int] = []
+
+    def state_id(states: set[State]) -> int:
+        if not states:
+            return DEAD
+        closure = epsilon_closure(states)
+        if closure not in index:
+            index[closure] = len(queue)
+            queue.append(closure)
+        return index[closure]
+
+    for current in queue:
+        moves: dict[str, set[State]] = {}
+        for state in current:
+            for symbol, targets in state.transitions.items():
+                if symbol != EPSILON:
+                    moves.setdefault(symbol, set()).update(targets)
+
+        any_targets = moves.pop(ANY, set())
+        transitions.append({symbol: state_id(targets) for symbol, targets in moves.items()})
+        any_transitions.append(state_id(any_targets))
+        priorities = [accept_priority[state] for state in current if state in accept_priority]
+        accepts.append(min(priorities) if priorities else DEAD)
+
+    return CombinedMachine(transitions, any_transitions, accepts)
+
+
+class CombinedSimulator:
+    def __init__(self, regexes: list[str]):
+        self.machine = build_combined_machine(regexes)
+        self.compiled = compile_machine(self.machine.transitions, self.machine.any_transitions, self.machine.accepts)
+
+    def match(self, text: str, start: int = 0) -> tuple[int, int]:
+        """
+        Самое длинное совпадение, начинающееся с позиции start.
+        Возвращает (номер токена, позиция конца) или (DEAD, start).
+        """
+        return self.compiled.match(text, start)
@@ -0,0 +1,81 @@
+from array import array
+
+DEAD = -1
+# Класс символов, которых нет в алфавите автомата: по ним возможен только ANY
+OTHER_CLASS = 0
+
+
+class CompiledMachine:
+    """
+    ДКА с целыми номерами состояний и плоской таблицей переходов
+    states x классы символов. Символы с одинаковыми столбцами переходов
+    объединены в один класс; для кодов < 256 класс берётся из массива,
+    для остальных - из словаря.
+    """
+
+    def __init__(self, classes: array, wide_classes: dict[str, int], width: int,
+                 table: array, accepts: array, initial: int = 0):
+        self.classes = classes
+        self.wide_classes = wide_classes
+        self.width = width
+        self.table = table
+        self.accepts = accepts
+        self.initial = initial
+
+    def match(self, text: str, start: int = 0) -> tuple[int, int]:
+        """
+        Самое длинное допускаемое продолжение с позиции start.
+        Возвращает (метка допускающего состояния, позиция конца) или (DEAD, start).
+        """
+        classes = self.classes
+        wide_classes = self.wide_classes
+        width = self.width
+        table = self.table
+        accepts = self.accepts
+
+        state = self.initial
+        tag, end = accepts[state], start
+        for position in range(start, len(text)):
+            code = ord(text[position])
+            if code < 256:
+                symbol_class = classes[code]
+            else:
+                symbol_class = wide_classes.get(text[position], OTHER_CLASS)
+            state = table[state * width + symbol_class]
+            if state == DEAD:
+                break
+            if accepts[state] != DEAD:
+                tag, end = accepts[state], position + 1
+        return tag, end
+
+
+def compile_machine(transitions: list[dict[str, int]], any_transitions: list[int],
+                    accepts: list[int], initial: int = 0) -> CompiledMachine:
+    """
+    transitions[state][symbol] - переход по символу, any_transitions[state] - по ANY
+    (используется, если перехода по самому символу нет), accepts[state] - метка или DEAD.
+    """
+    alphabet = sorted({symbol for row in transitions for symbol in row if len(symbol) == 1})
+
+    other_column = tuple(any_transitions)
+    columns = {other_column: OTHER_CLASS}
+    symbol_classes: dict[str, int] = {}
+    for symbol in alphabet:
+        column = tuple(row.get(symbol, any_target) for row, any_target in zip(transitions, any_transitions))
+        symbol_classes[symbol] = columns.setdefault(column, len(columns))
+
+    classes = array('i', [OTHER_CLASS]) * 256
+    wide_classes = {}
+    for symbol, symbol_class in symbol_classes.items():
+        if ord(symbol) < 256:
+            classes[ord(symbol)] = symbol_class
+        else:
+            wide_classes[symbol] = symbol_class
+
+    width = len(columns)
+    table = array('i', [DEAD]) * (len(transitions) * width)
+    for column, symbol_class in columns.items():
+        for state, target in enumerate(column):
+            table[state * width + symbol_class] = target
+
+    return CompiledMachine(classes, wide_classes, width, table, array('i', accepts), initial)
@@ -1,6 +1,7 @@
 from .regex_to_nfa import process_regex
 from .nfa_to_dfa import process_nfa
-from .minimize import process_dfa
+from .minimize import process_dfa, Machine
+from .compiled import CompiledMachine, DEAD, compile_machine
 
 
 def convert_regex_to_dfa(regex: str):
@@ -10,23 +11,29 @@ def convert_regex_to_dfa(regex: str):
     return machine
 
 
+def compile_dfa(machine: Machine) -> CompiledMachine:
+    states, input_symbols, transitions, outputs, initial_state = machine
+    ids = {state: i for i, state in enumerate(states)}
+
+    def target(state: str, symbol: str) -> int:
+        next_state = transitions[state].get(symbol, '')
+        return ids[next_state] if next_state else DEAD
+
+    return compile_machine(
+        [{symbol: target(state, symbol) for symbol in input_symbols
+          if symbol != 'ANY' and target(state, symbol) != DEAD} for state in states],
+        [target(state, 'ANY') for state in states],
+        [0 if outputs[state] == 'F' else DEAD for state in states],
+        ids[initial_state]
+    )
+
+
 class Simulator:
     def __init__(self, regex: str):
         self.machine = convert_regex_to_dfa(regex)
+        self.compiled = compile_dfa(self.machine)
 
     def run(self, text: str) -> str:
-        states, input_symbols, transitions, outputs, initial_state = self.machine
-
-        result = ''
-        current_state = initial_state
-        for symbol in text:
-            if symbol not in input_symbols and 'ANY' not in input_symbols:
-                return result if outputs[current_state] == 'F' else ''
-            transition = transitions[current_state].get(symbol, '')
-            if transition == '':
-                transition = transitions[current_state].get('ANY', '')
-            if transition == '':
-                return result if outputs[current_state] == 'F' else ''
-            result += symbol
-            current_state = transition
-        return result if outputs[current_state] == 'F' else ''
+        # Самый длинный допускаемый префикс
+        tag, end = self.compiled.match(text)
+        return text[:end] if tag != DEAD else ''
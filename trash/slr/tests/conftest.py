@@ -0,0 +1,37 @@
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from CompileTable import compile_table
+from CreateTable import create_table
+from ReadGrammar import read_grammar
+from token_type import TOKEN_TYPES
+
+PROGRAM_GRAMMAR = """
+prog -> PROGRAM IDENTIFIER SEMICOLON block DOT #
+block -> BEGIN stmts END
+stmts -> stmt | stmts SEMICOLON stmt
+stmt -> IDENTIFIER ASSIGN expr | block
+expr -> expr PLUS term | term
+term -> term MULTIPLICATION factor | factor
+factor -> IDENTIFIER | INTEGER | LEFT_PAREN expr RIGHT_PAREN
+"""
+
+
+@pytest.fixture(scope="session")
+def program_grammar():
+    return read_grammar(io.StringIO(PROGRAM_GRAMMAR), [token.name for token in TOKEN_TYPES])
+
+
+@pytest.fixture(scope="session")
+def program_table(program_grammar):
+    return create_table(program_grammar)
+
+
+@pytest.fixture(scope="session", params=[False, True], ids=["dense", "comb"])
+def compiled(request, program_grammar, program_table):
+    return compile_table(program_table, program_grammar, compress=request.param)
@@ -0,0 +1,72 @@
+import io
+import random
+
+import pytest
+
+from CompileTable import EMPTY, compile_table, pack_comb, pack_dense
+from CreateTable import create_table
+from ReadGrammar import read_grammar
+from token_type import TOKEN_TYPES
+
+
+def nested_lists_grammar(depth: int) -> str:
+    lines = ["S -> L0 #"]
+    for i in range(depth):
+        inner = f"LEFT_BRACKET L{i + 1} RIGHT_BRACKET" if i + 1 < depth else "LEFT_BRACKET INTEGER RIGHT_BRACKET"
+        lines.append(f"L{i} -> L{i} COMMA X{i} | X{i}")
+        lines.append(f"X{i} -> {inner} | IDENTIFIER | MINUS X{i}")
+    return "\n".join(lines) + "\n"
+
+
+def assert_same_cells(dense, packed, states: int, width: int):
+    for state in range(states):
+        for column in range(width):
+            assert packed.get(state, column) == dense.get(state, column), (state, column)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_comb_packing_round_trips_random_rows(seed):
+    rnd = random.Random(seed)
+    width = rnd.randint(1, 40)
+    rows = []
+    for _ in range(rnd.randint(1, 60)):
+        columns = sorted(rnd.sample(range(width), rnd.randint(0, min(width, 6))))
+        rows.append([(column, rnd.choice([-3, -1, 1, 7, 42])) for column in columns])
+
+    packed = pack_comb(rows, width)
+    assert_same_cells(pack_dense(rows, width), packed, len(rows), width)
+    assert sum(1 for owner in packed.check if owner != -1) == sum(len(row) for row in rows)
+
+
+def test_comb_packing_fills_holes():
+    rows = [[(0, 1), (2, 1), (4, 1)], [(1, 2), (3, 2)], [(0, 3)]]
+    packed = pack_comb(rows, 5)
+    assert list(packed.base) == [0, 0, 5]
+    assert list(packed.check[:6]) == [0, 1, 0, 1, 0, 2]
+
+
+@pytest.mark.parametrize("text", [nested_lists_grammar(3), nested_lists_grammar(8)], ids=["depth3", "depth8"])
+def test_compiled_tables_agree(text):
+    grammar = read_grammar(io.StringIO(text), [token.name for token in TOKEN_TYPES])
+    table = create_table(grammar)
+    dense = compile_table(table, grammar)
+    packed = compile_table(table, grammar, compress=True)
+
+    states = len(table.strings)
+    assert_same_cells(dense.action, packed.action, states, len(dense.terminals))
+    assert_same_cells(dense.goto, packed.goto, states, len(dense.non_terminals))
+    assert packed.nbytes() < dense.nbytes()
+    for state in range(states):
+        assert packed.expected(state) == dense.expected(state)
+    # Каждая непустая ячейка ACTION соответствует терминалу из строки таблицы
+    for state, table_str in enumerate(table.strings):
+        filled = {name for name, column in dense.terminals.items() if dense.action.get(state, column) != EMPTY}
+        assert filled <= set(table_str.next_symbols)
+
+
+def test_program_grammar_tables_agree(program_grammar, program_table):
+    dense = compile_table(program_table, program_grammar)
+    packed = compile_table(program_table, program_grammar, compress=True)
+    states = len(program_table.strings)
+    assert_same_cells(dense.action, packed.action, states, len(dense.terminals))
+    assert_same_cells(dense.goto, packed.goto, states, len(dense.non_terminals))
@@ -0,0 +1,84 @@
+import pytest
+
+import lexer
+from lexer import Lexer
+
+PROGRAM = (
+    "PROGRAM chunks;\n"
+    "VAR total, counter: INTEGER;\n"
+    "{ длинный блочный комментарий, который заведомо\n"
+    "  пересекает границу нескольких маленьких блоков }\n"
+    "BEGIN\n"
+    "  total := 12345 + counter * 3.25E-2; // комментарий до конца строки\n"
+    "  WRITELN('строка с пробелами и ; внутри', total);\n"
+    "  IF total > 1.5 THEN counter := counter - .5 ELSE counter := 0;\n"
+    "  {a}{b} x1 := y2\t/ z3;\n"
+    "  arr[1] := 'x'\n"
+    "END.\n"
+)
+
+# Маленькие блоки заставляют каждый длинный токен пересечь границу чтения
+CHUNKS = [(1, 1), (3, 1), (7, 3), (16, 4), (64, 8)]
+
+
+def write(tmp_path, text: str) -> str:
+    path = tmp_path / "program.pas"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def tokens(path: str, track_positions: bool = True) -> list[tuple]:
+    source = Lexer(path, track_positions)
+    try:
+        return [(token.type, token.value, token.pos, token.offset) for token in iter(source.next_token, None)]
+    finally:
+        source.close()
+
+
+@pytest.mark.parametrize("chunk_size,lookahead", CHUNKS)
+def test_token_stream_does_not_depend_on_chunk_size(tmp_path, monkeypatch, chunk_size, lookahead):
+    path = write(tmp_path, PROGRAM * 3)
+    expected = tokens(path)
+    monkeypatch.setattr(lexer, "CHUNK_SIZE", chunk_size)
+    monkeypatch.setattr(lexer, "MIN_LOOKAHEAD", lookahead)
+    assert tokens(path) == expected
+
+
+@pytest.mark.parametrize("chunk_size,lookahead", CHUNKS)
+def test_unterminated_tokens_across_chunks(tmp_path, monkeypatch, chunk_size, lookahead):
+    # Ошибочные токены поглощают весь остаток буфера, поэтому проверяем только
+    # незакрытую конструкцию в самом конце файла
+    for tail in ("{ не закрыт", "'не закрыта", "// без перевода строки"):
+        path = write(tmp_path, "x := 1;\n" + tail)
+        expected = tokens(path)
+        monkeypatch.setattr(lexer, "CHUNK_SIZE", chunk_size)
+        monkeypatch.setattr(lexer, "MIN_LOOKAHEAD", lookahead)
+        assert tokens(path) == expected
+        monkeypatch.undo()
+
+
+def test_position_of_matches_tracked_positions(tmp_path, monkeypatch):
+    path = write(tmp_path, PROGRAM)
+    monkeypatch.setattr(lexer, "CHUNK_SIZE", 5)
+    source = Lexer(path, track_positions=False)
+    try:
+        resolved = [(source.position_of(token.offset), token.offset) for token in iter(source.next_token, None)]
+    finally:
+        source.close()
+    assert resolved == [(pos, offset) for _, _, pos, offset in tokens(path)]
+
+
+# Самое длинное совпадение общего ДКА; в комментариях - поток до перехода на него
+@pytest.mark.parametrize("text,expected", [
+    ("total", [("IDENTIFIER", "total")]),  # было TO 'to', BAD 'tal'
+    ("WRITELN", [("WRITELN", "WRITELN")]),  # было WRITE, BAD 'LN'
+    ("div2", [("IDENTIFIER", "div2")]),  # было DIV, BAD '2'
+    (".5E-3", [("FLOAT", ".5E-3")]),  # было DOT, FLOAT '5E-3'
+    ("TOdo", [("IDENTIFIER", "TOdo")]),  # было TO, DO
+    ("ENDx", [("IDENTIFIER", "ENDx")]),
+    ("BEGINx", [("IDENTIFIER", "BEGINx")]),
+    ("3.", [("INTEGER", "3"), ("DOT", ".")]),
+    ("1abc", [("BAD", "1abc")]),
+])
+def test_longest_match(tmp_path, text, expected):
+    assert [(token_type, value) for token_type, value, _, _ in tokens(write(tmp_path, text))] == expected
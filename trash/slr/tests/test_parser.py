@@ -0,0 +1,68 @@
+from Parser import parse_file, parse_tokens
+from lexer import Lexer
+
+
+def write(tmp_path, text: str) -> str:
+    path = tmp_path / "program.pas"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_accepts_program(tmp_path, compiled):
+    result = parse_file(write(tmp_path, "PROGRAM p;\nBEGIN\n  x := (1 + y) * 2;\n  BEGIN y := x END\nEND.\n"), compiled)
+    assert result.accepted
+    assert result.tokens == 21
+
+
+def test_reports_unexpected_token(tmp_path, compiled):
+    result = parse_file(write(tmp_path, "PROGRAM p;\nBEGIN\n  x := ;\nEND.\n"), compiled)
+    assert not result.accepted
+    assert (result.resolve_position(), result.token, result.value) == ((3, 8), "SEMICOLON", ";")
+    assert sorted(result.expected) == ["IDENTIFIER", "INTEGER", "LEFT_PAREN"]
+    assert str(result) == ("Ошибка разбора в строке 3, столбце 8: встречен токен ';' (SEMICOLON), "
+                           "ожидалось: " + ", ".join(result.expected))
+
+
+def test_reports_end_of_input(tmp_path, compiled):
+    result = parse_file(write(tmp_path, "PROGRAM p;\nBEGIN x := 1\n"), compiled)
+    assert (result.accepted, result.resolve_position(), result.token, result.value) == (False, (3, 1), "#", None)
+
+
+def test_rejects_trailing_tokens(tmp_path, compiled):
+    result = parse_file(write(tmp_path, "PROGRAM p; BEGIN x := 1 END. x"), compiled)
+    assert (result.accepted, result.resolve_position(), result.value) == (False, (1, 30), "x")
+
+
+def test_untracked_tokens_without_resolver(tmp_path, compiled):
+    lexer = Lexer(write(tmp_path, "PROGRAM p;\nBEGIN\n  x := ;\nEND.\n"), track_positions=False)
+    try:
+        result = parse_tokens(iter(lexer.next_token, None), compiled)
+    finally:
+        lexer.close()
+    assert result.position is None and result.offset == 24
+    assert str(result).startswith("Ошибка разбора на смещении 24: встречен токен ';'")
+
+
+def test_untracked_tokens_resolve_position_lazily(tmp_path, compiled):
+    path = write(tmp_path, "PROGRAM p;\nBEGIN\n  x := ;\nEND.\n")
+    lexer = Lexer(path, track_positions=False)
+    try:
+        result = parse_tokens(iter(lexer.next_token, None), compiled, lexer.position_of)
+    finally:
+        lexer.close()
+    assert result.position is None and lexer.line_starts is None
+    assert str(result).startswith("Ошибка разбора в строке 3, столбце 8:")
+    assert result.position == (3, 8)
+
+
+def test_tracked_and_untracked_positions_agree(tmp_path, compiled):
+    text = "PROGRAM p;\n{ comment\n spanning lines }\nBEGIN // note\n  x := 1 +\n\n  ;\nEND.\n"
+    path = write(tmp_path, text)
+    lexer = Lexer(path)
+    try:
+        tracked = parse_tokens(iter(lexer.next_token, None), compiled)
+    finally:
+        lexer.close()
+    untracked = parse_file(path, compiled)
+    assert tracked.position == untracked.resolve_position() == (7, 3)
+    assert str(tracked) == str(untracked)
@@ -0,0 +1,25 @@
+import copy
+import os
+import pickle
+import subprocess
+import sys
+
+from Symbol import Symbol
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def test_copy_keeps_equality_and_hash():
+    symbol = Symbol("E", 0, 1)
+    for duplicate in (copy.copy(symbol), copy.deepcopy(symbol), pickle.loads(pickle.dumps(symbol))):
+        assert duplicate == symbol and hash(duplicate) == hash(symbol) and str(duplicate) == "E12"
+
+
+def test_unpickled_symbol_hashes_like_a_fresh_one():
+    # Символ, сохранённый процессом с другим PYTHONHASHSEED, должен попадать в те же ячейки множеств
+    script = "import pickle, sys; from Symbol import Symbol; sys.stdout.buffer.write(pickle.dumps(Symbol('E', 0, 1)))"
+    data = subprocess.run([sys.executable, "-c", script], cwd=SOURCE_DIR, capture_output=True, check=True,
+                          env=dict(os.environ, PYTHONHASHSEED="12345")).stdout
+    symbol = pickle.loads(data)
+    assert symbol == Symbol("E", 0, 1)
+    assert len({symbol, Symbol("E", 0, 1)}) == 1